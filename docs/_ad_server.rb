@@ -0,0 +1,32 @@
+#!/usr/bin/env ruby
+
+# Long-lived asciidoctor worker for docs/generate.py
+#
+# Reads documents from stdin separated by a form-feed line and writes the
+# converted HTML back followed by a form-feed line, so the Ruby VM starts
+# once per doc build instead of once per document.
+
+require 'asciidoctor'
+
+$stdout.sync = true
+
+ATTRIBUTES = {
+  'table-frame' => 'all',
+  'table-grid' => 'all',
+  'table-stripes' => 'even',
+  'relfilesuffix' => '.html',
+  'outfilesuffix' => '.html'
+}.freeze
+
+buffer = +''
+$stdin.each_line do |line|
+  if line == "\f\n"
+    html = Asciidoctor.convert(buffer, backend: 'html5', standalone: false,
+                               safe: :safe, attributes: ATTRIBUTES)
+    $stdout.write(html)
+    $stdout.write("\n\f\n")
+    buffer = +''
+  else
+    buffer << line
+  end
+end
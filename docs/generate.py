@@ -2,57 +2,177 @@
 
 # Minimal doc generator for layers
 
+import functools
+import hashlib
+import logging
 import os
+import re
+import shutil
+import subprocess
 import sys
+import threading
 from pathlib import Path
 import tempfile
-from jinja2 import Environment, FileSystemLoader
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
+_MD_LOCAL = threading.local()
+
+
+def _get_markdown():
+    """Per-thread Markdown converter, or None when markdown is unavailable.
+
+    Each construction re-registers every extension (and compiles their
+    regexes), so instances are kept and reused with reset(). One instance
+    per thread because Markdown.convert() is not thread-safe."""
+    if markdown is None:
+        return None
+    md = getattr(_MD_LOCAL, 'md', None)
+    if md is None:
+        md = _MD_LOCAL.md = markdown.Markdown(extensions=['tables', 'fenced_code', 'toc'])
+    return md
 
 script_dir = Path(__file__).parent
 sys.path.insert(0, str(script_dir.parent / 'site'))
 from layer_manager import LayerManager
 from validators import get_validator_documentation_data
 
+log = logging.getLogger('docgen')
+
+
+# Rewrites .adoc links to .html for web navigation. Compiled once at module
+# scope so conversions don't depend on the re module's internal cache.
+_ADOC_LINK_RE = re.compile(r'href="([^"]+)\.adoc"')
+
+class _AsciidoctorServer:
+    """Long-lived asciidoctor worker speaking a form-feed framed protocol.
+
+    Ruby VM startup dominates the cost of converting small documents; the
+    worker (docs/_ad_server.rb) pays it once per build. convert() returns
+    None when the worker can't run so callers can fall back to one-shot
+    asciidoctor/pandoc invocations.
+    """
+
+    _SENTINEL = "\f\n"
+
+    def __init__(self):
+        self._proc = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def convert(self, content: str):
+        if self._failed:
+            return None
+        with self._lock:
+            try:
+                proc = self._ensure()
+                proc.stdin.write(content)
+                if not content.endswith('\n'):
+                    proc.stdin.write('\n')
+                proc.stdin.write(self._SENTINEL)
+                proc.stdin.flush()
+
+                lines = []
+                while True:
+                    line = proc.stdout.readline()
+                    if not line:
+                        raise OSError("asciidoctor worker terminated")
+                    if line == self._SENTINEL:
+                        return ''.join(lines)
+                    lines.append(line)
+            except OSError:
+                self._failed = True
+                if self._proc is not None:
+                    self._proc.kill()
+                    self._proc = None
+                return None
+
+    def _ensure(self):
+        if self._proc is None or self._proc.poll() is not None:
+            # stderr discarded to match the one-shot path (capture_output)
+            self._proc = subprocess.Popen(
+                ['ruby', str(script_dir / '_ad_server.rb')],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, text=True)
+        return self._proc
+
+
+_AD_SERVER = _AsciidoctorServer()
+
+
+def md2html_batch(contents: list, format: str = 'asciidoc') -> list:
+    """Convert multiple documents, amortising converter startup costs.
+
+    Duplicate documents are converted once, and asciidoc goes through the
+    resident worker when it is available. Conversion is always per document:
+    companion docs each carry their own level-0 title, so feeding them to
+    asciidoctor as one joined article would produce broken HTML.
+    """
+    contents = list(contents)
+
+    # Layers can share boilerplate companion docs - convert unique content
+    # once and fan the results back out
+    unique = list(dict.fromkeys(contents))
+    if len(unique) != len(contents):
+        converted = dict(zip(unique, md2html_batch(unique, format)))
+        return [converted[content] for content in contents]
+
+    if format == 'asciidoc':
+        # Prefer the resident worker - no forks at all
+        converted = [_AD_SERVER.convert(content) for content in contents]
+        if all(html is not None for html in converted):
+            return [_ADOC_LINK_RE.sub(r'href="\1.html"', html) for html in converted]
+    # Worker unavailable - md2html sorts out the one-shot/pandoc fallback
+    return [md2html(content, format) for content in contents]
 
-def md2html(content: str, format: str = 'asciidoc') -> str:
-    import subprocess
 
+# Memoized - index pages and companion docs can repeat identical content
+# within a run, and each miss costs a full converter subprocess fork.
+@functools.lru_cache(maxsize=None)
+def md2html(content: str, format: str = 'asciidoc') -> str:
     supported_formats = {'asciidoc', 'markdown'}
     if format not in supported_formats:
         supported = ', '.join(supported_formats)
         raise ValueError(f"Unsupported format '{format}'. Supported: {supported}")
 
     html_output = None
-    
+
     # Try the best tool for each format
     if format == 'asciidoc':
-        try:
-            result = subprocess.run([
-                'asciidoctor', 
-                '-b', 'html5',  # HTML5 backend
-                '-s',           # Suppress header/footer
-                '-a', 'table-frame=all',    # Table frame
-                '-a', 'table-grid=all',     # Table grid
-                '-a', 'table-stripes=even', # Table striping
-                '-'
-            ], input=content, capture_output=True, text=True, check=True)
-            html_output = result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print("asciidoctor not found - falling back")
-            pass
+        html_output = _AD_SERVER.convert(content)
+        if html_output is None:
+            try:
+                result = subprocess.run([
+                    'asciidoctor',
+                    '-b', 'html5',  # HTML5 backend
+                    '-s',           # Suppress header/footer
+                    '-a', 'table-frame=all',    # Table frame
+                    '-a', 'table-grid=all',     # Table grid
+                    '-a', 'table-stripes=even', # Table striping
+                    '-a', 'relfilesuffix=.html',  # Emit .html cross-document links
+                    '-a', 'outfilesuffix=.html',
+                    '-'
+                ], input=content, capture_output=True, text=True, check=True)
+                html_output = result.stdout
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                log.warning("asciidoctor not found - falling back")
 
     elif format == 'markdown':
-        try:
-            import markdown
-            md = markdown.Markdown(extensions=['tables', 'fenced_code', 'toc'])
+        md = _get_markdown()
+        if md is not None:
+            md.reset()  # Clear state without rebuilding the extension pipeline
             html_output = md.convert(content)
-        except ImportError:
-            print("markdown not found - falling back")
-            pass
+        else:
+            log.warning("markdown not found - falling back")
 
     # fallback to pandoc
     if html_output is None:
-        print('fallback to pandoc for conversion from ', format)
+        log.warning(f'fallback to pandoc for conversion from {format}')
         try:
             result = subprocess.run(
                 ['pandoc', '-f', format, '-t', 'html', '-'],
@@ -65,12 +185,95 @@ def md2html(content: str, format: str = 'asciidoc') -> str:
         except (subprocess.CalledProcessError, FileNotFoundError):
             raise Exception("Fallback conversion failed for format", format)
 
-    # Post-process: convert .adoc links to .html for web navigation
-    import re
-    html_output = re.sub(r'href="([^"]+)\.adoc"', r'href="\1.html"', html_output)
+    # Post-process: convert .adoc links to .html for web navigation. The
+    # relfilesuffix/outfilesuffix attributes only cover xref: targets; link:
+    # macro targets come out of asciidoctor verbatim, so this pass runs on
+    # every converter's output (it is cheap and idempotent).
+    html_output = _ADOC_LINK_RE.sub(r'href="\1.html"', html_output)
     return html_output
 
 
+_MD2HTML_CACHE_DIR = script_dir / '.md2html_cache'
+
+
+@functools.lru_cache(maxsize=None)
+def _converter_tag(format: str) -> str:
+    """Identity of the tool chain md2html will use for a format.
+
+    Folded into the on-disk cache key so HTML produced by the degraded
+    pandoc fallback stops being served once the preferred converter is
+    installed (and vice versa), instead of lingering until the source
+    content happens to change.
+    """
+    if format == 'asciidoc':
+        if _AD_SERVER.convert('') is not None or shutil.which('asciidoctor'):
+            return 'asciidoctor'
+    elif format == 'markdown':
+        if markdown is not None:
+            return 'markdown'
+    return 'pandoc'
+
+
+def md2html_cached(content: str, format: str = 'asciidoc') -> str:
+    """md2html with an on-disk cache keyed by converter and content hash.
+
+    Index page sources rarely change between builds, so repeat runs get a
+    hash lookup and a file read instead of a converter subprocess.
+    """
+    key = hashlib.blake2b(f'{_converter_tag(format)}\0{format}\0{content}'.encode(),
+                          digest_size=16).hexdigest()
+    cached = _MD2HTML_CACHE_DIR / key
+    if cached.exists():
+        return cached.read_text()
+    html_output = md2html(content, format)
+    _MD2HTML_CACHE_DIR.mkdir(exist_ok=True)
+    cached.write_text(html_output)
+    return html_output
+
+
+def _up_to_date(output: Path, *input_mtimes: float) -> bool:
+    """True if output exists and is newer than every input mtime."""
+    return output.exists() and output.stat().st_mtime > max(input_mtimes)
+
+
+def _write_page(path: Path, content: str) -> bool:
+    """Write content only when it differs from what is already on disk.
+
+    Leaving unchanged outputs untouched avoids block I/O and keeps mtimes
+    stable so downstream incremental tools (rsync, watchers) see no churn.
+    """
+    data = content.encode('utf-8')
+    if path.exists():
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if hashlib.blake2b(path.read_bytes(), digest_size=16).digest() == digest:
+            log.debug(f"Unchanged: {path}")
+            return False
+    # Already encoded for hashing - write the bytes straight out rather than
+    # going back through the locale-dependent text layer
+    path.write_bytes(data)
+    log.debug(f"Generated: {path}")
+    return True
+
+
+def _render_layer(layer_name, doc_data, layer_template, layer_dir):
+    """Render and write a single layer page, returning its index entry."""
+    doc_data.setdefault('companion_html', "")
+
+    # Render layer page
+    html_content = layer_template.render(layer=doc_data)
+
+    # Write layer page
+    _write_page(layer_dir / f"{layer_name}.html", html_content)
+
+    # Info for index
+    return {
+        'name': layer_name,
+        'description': doc_data['layer_info'].get('description', 'No description'),
+        'category': doc_data['layer_info'].get('category', 'uncategorised'),
+        'filename': f"layer/{layer_name}.html"
+    }
+
+
 def main():
     script_dir = Path(__file__).parent  # The docs/ directory
     doc_dir = script_dir  # Generate in the docs directory
@@ -80,8 +283,20 @@ def main():
     exec_dir = doc_dir / 'execution'
     templates_dir = script_dir.parent / 'templates' / 'docs' / 'html'
 
-    # jinja init
-    env = Environment(loader=FileSystemLoader(str(templates_dir)))
+    # jinja init - persist compiled template bytecode so repeated doc builds
+    # skip the parse/compile step entirely
+    cache_dir = script_dir / '.jinja_cache'
+    cache_dir.mkdir(exist_ok=True)
+    bcc = FileSystemBytecodeCache(directory=str(cache_dir), pattern='%s.cache')
+    # auto_reload=False also skips the per-get_template mtime stat
+    env = Environment(loader=FileSystemLoader(str(templates_dir)),
+                      bytecode_cache=bcc, auto_reload=False, cache_size=400)
+
+    # Fetch each template once - get_template re-parses on every call otherwise
+    layer_template = env.get_template('layer.html')
+    index_template = env.get_template('index.html')
+    layer_index_template = env.get_template('layer-index.html')
+    help_template = env.get_template('variable-validation.html')
 
     # Load layers
     layer_paths = [
@@ -97,158 +312,122 @@ def main():
     with tempfile.TemporaryDirectory(prefix="layer-docs-") as tmp_root:
         tmpdir = Path(tmp_root)
         layer_paths = [f"TMPROOT_layer={tmpdir}"] + layer_paths
-        manager = LayerManager(layer_paths, doc_mode=True)
+        manager = LayerManager(layer_paths, doc_mode=True,
+                               manifest_path=str(script_dir / '.layer_manifest.json'))
 
         # All layer names
         layer_names = sorted(manager.layers.keys())
 
-        # Do it
-        layer_template = env.get_template('layer.html')
-        layers_info = []
-
+        layer_tmpl_mtime = os.path.getmtime(templates_dir / 'layer.html')
+        index_tmpl_mtime = os.path.getmtime(templates_dir / 'index.html')
+
+        # Rendered pages show cross-layer data (reverse dependencies,
+        # provider-resolved categorisation), so any layer file change - or a
+        # change to the layer set itself - invalidates every page, not just
+        # the edited layer's own.
+        all_layers_mtime = max((Path(path).stat().st_mtime
+                                for path in manager.layer_files.values()), default=0.0)
+        index_stamp = layer_dir / '.index_layers'
+        stamp = '\n'.join(layer_names)
+        layer_set_changed = not (index_stamp.exists() and index_stamp.read_text() == stamp)
+
+        def _layer_inputs_mtime(layer_name):
+            """Newest mtime of any layer source and this layer's companion doc."""
+            adoc = Path(manager.layer_files[layer_name]).with_suffix('.adoc')
+            return max(all_layers_mtime,
+                       adoc.stat().st_mtime if adoc.exists() else 0.0)
+
+        # Gather per-layer data first so all companion docs can be converted
+        # with a single asciidoctor invocation. Pages whose output is already
+        # newer than the layer sources and template are not regenerated.
+        stale_names = []
+        cached_info = {}
         for layer_name in layer_names:
-            doc_data = manager.get_layer_documentation_data(layer_name)
-            if doc_data:
-                # If present, convert companion doc to HTML
-                if doc_data.get('companion_doc'):
-                    print('Companion: ', layer_name)
-                    doc_data['companion_html'] = md2html(doc_data['companion_doc'])
-                else:
-                    doc_data['companion_html'] = ""
-
-                # Render layer page
-                html_content = layer_template.render(layer=doc_data)
-
-                # Write layer page
-                layer_file = layer_dir / f"{layer_name}.html"
-                layer_file.write_text(html_content)
-
-                # Collect info for index
-                layers_info.append({
+            layer_file = layer_dir / f"{layer_name}.html"
+            if not layer_set_changed and \
+                    _up_to_date(layer_file, _layer_inputs_mtime(layer_name), layer_tmpl_mtime):
+                info = manager.get_layer_info(layer_name) or {}
+                cached_info[layer_name] = {
                     'name': layer_name,
-                    'description': doc_data['layer_info'].get('description', 'No description'),
-                    'category': doc_data['layer_info'].get('category', 'uncategorised'),
+                    'description': info.get('description', 'No description'),
+                    'category': info.get('category', 'uncategorised'),
                     'filename': f"layer/{layer_name}.html"
-                })
-
-                print(f"Generated: {layer_file}")
-
-        # Generate main index page
-        index_md = script_dir / 'index.adoc'
-        if index_md.exists():
-            md_content = index_md.read_text()
-            index_content = md2html(md_content)
-        else:
-            raise Exception("No content for top level index!")
-
-        # Render main index page
-        index_template = env.get_template('index.html')
-        index_html = index_template.render(
-            content=index_content,
-            layers=[]  # No layers on main page
-        )
-
-        # Write main index page
-        index_file = doc_dir / 'index.html'
-        index_file.write_text(index_html)
-        print(f"Generated: {index_file}")
-
-
-        # Generate config index page
-        index_md = config_dir / 'index.adoc'
-        if index_md.exists():
-            md_content = index_md.read_text()
-            index_content = md2html(md_content)
-        else:
-            raise Exception("No content for config index!")
-
-        # Render config index page
-        index_template = env.get_template('index.html')
-        index_html = index_template.render(
-            content=index_content,
-            layers=[]  # No layers
-        )
-
-        # Write config index page
-        index_file = config_dir / 'index.html'
-        index_file.write_text(index_html)
-        print(f"Generated: {index_file}")
-
-
-
-        # Generate provisioning index page
-        index_md = prov_dir / 'index.adoc'
-        if index_md.exists():
-            md_content = index_md.read_text()
-            index_content = md2html(md_content)
-        else:
-            raise Exception("No content for provisioning index!")
-
-        # Render config index page
-        index_template = env.get_template('index.html')
-        index_html = index_template.render(
-            content=index_content,
-            layers=[]  # No layers
-        )
-
-        # Write provisioning index page
-        index_file = prov_dir / 'index.html'
-        index_file.write_text(index_html)
-        print(f"Generated: {index_file}")
-
-
-
-        # Generate execution index page
-        index_md = exec_dir / 'index.adoc'
-        if index_md.exists():
-            md_content = index_md.read_text()
-            index_content = md2html(md_content)
-        else:
-            raise Exception("No content for execution index!")
-
-        # Render execution index page
-        index_template = env.get_template('index.html')
-        index_html = index_template.render(
-            content=index_content,
-            layers=[]  # No layers
-        )
-
-        # Write execution index page
-        index_file = exec_dir / 'index.html'
-        index_file.write_text(index_html)
-        print(f"Generated: {index_file}")
-
-
+                }
+                log.debug(f"Up to date: {layer_file}")
+                continue
+            stale_names.append(layer_name)
+
+        layer_docs = list(manager.iter_documentation_data(stale_names))
+
+        companions = [(name, data) for name, data in layer_docs if data.get('companion_doc')]
+        for name, _ in companions:
+            log.debug(f'Companion: {name}')
+        for (_, doc_data), html in zip(companions,
+                                       md2html_batch([d['companion_doc'] for _, d in companions])):
+            doc_data['companion_html'] = html
+
+        # Layer pages are independent, so render and write them in parallel.
+        # The work is I/O bound (file writes) and Template.render is
+        # thread-safe as long as env isn't mutated, so threads suffice.
+        # ex.map preserves input order, keeping layers_info deterministic.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            rendered_info = list(ex.map(
+                lambda item: _render_layer(item[0], item[1], layer_template, layer_dir),
+                layer_docs))
+
+        # Merge freshly rendered and up-to-date entries back into name order
+        cached_info.update({entry['name']: entry for entry in rendered_info})
+        layers_info = [cached_info[name] for name in layer_names if name in cached_info]
+
+        # Generate the section index pages - identical apart from source dir
+        for page_dir, page_name in ((doc_dir, 'top level'), (config_dir, 'config'),
+                                    (prov_dir, 'provisioning'), (exec_dir, 'execution')):
+            index_md = page_dir / 'index.adoc'
+            index_file = page_dir / 'index.html'
+            if not index_md.exists():
+                raise Exception(f"No content for {page_name} index!")
+            if _up_to_date(index_file, index_md.stat().st_mtime, index_tmpl_mtime):
+                log.debug(f"Up to date: {index_file}")
+                continue
+
+            index_html = index_template.render(
+                content=md2html_cached(index_md.read_text()),
+                layers=[]  # No layers on index pages
+            )
+            _write_page(index_file, index_html)
 
-        # Generate layer index page
+        # Generate layer index page. Its content depends on every layer, so
+        # only skip when no layer page was regenerated this run and the set
+        # of layers matches the last build - a deleted layer regenerates no
+        # page but still has to drop out of the listing.
         layer_index_md = script_dir / 'layer' / 'index.adoc'
-        if layer_index_md.exists():
-            layer_md_content = layer_index_md.read_text()
-            layer_index_content = md2html(layer_md_content)
-        else:
+        layer_index_file = layer_dir / 'index.html'
+        if not layer_index_md.exists():
             raise Exception("No content for layer index!")
+        if (not layer_docs and not layer_set_changed
+                and _up_to_date(layer_index_file, layer_index_md.stat().st_mtime,
+                                os.path.getmtime(templates_dir / 'layer-index.html'))):
+            log.debug(f"Up to date: {layer_index_file}")
+        else:
+            layer_index_content = md2html_cached(layer_index_md.read_text())
 
-        layer_index_template = env.get_template('layer-index.html')
-        layer_index_html = layer_index_template.render(
-            content=layer_index_content,
-            layers=layers_info
-        )
+            layer_index_html = layer_index_template.render(
+                content=layer_index_content,
+                layers=layers_info
+            )
 
-        # Write layer index page
-        layer_index_file = layer_dir / 'index.html'
-        layer_index_file.write_text(layer_index_html)
-        print(f"Generated: {layer_index_file}")
+            # Write layer index page
+            _write_page(layer_index_file, layer_index_html)
+            index_stamp.write_text(stamp)
 
         # Generate validation help page
-        help_template = env.get_template('variable-validation.html')
         validation_data = get_validator_documentation_data()
 
         vars_html = help_template.render(validation=validation_data)
-        vars_file = layer_dir / 'variable-validation.html'
-        vars_file.write_text(vars_html)
-        print(f"Generated: {vars_file}")
+        _write_page(layer_dir / 'variable-validation.html', vars_html)
 
-    print(f"\nDocumentation generated in {doc_dir}/")
+    log.info(f"Documentation generated in {doc_dir}/")
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     main()
@@ -1,16 +1,104 @@
-import configparser
+import copy
+import functools
 import os
+import re
 import sys
 import yaml
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, MutableMapping
+
+# Prefer the libyaml C extension when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
+# $VAR and ${VAR} references in override values
+_VAR_RE = re.compile(r'\$(?:\{([^}]+)\}|([A-Za-z_][A-Za-z0-9_]*))')
+
+# [section] header in INI files
+_INI_SECTION_RE = re.compile(r'^\[(.+)\]$')
+
+# One-shot classifier for INI lines during migration: !include, [section]
+# or key=value, dispatched on which group matched
+_INI_LINE = re.compile(r'^\s*(?:!include\s+(\S+)|\[([^\]]+)\]|([^=#\s][^=]*)=(.*))\s*$')
+
+# Parse results shared across loader instances, keyed by file identity
+# ((dev, inode, mtime_ns, size)) so unchanged files skip the parser when
+# the same file is loaded by several loaders in one process
+_PARSE_CACHE: Dict[tuple, Any] = {}
+
+# File format by suffix; anything unknown is treated as INI for backward compat
+_FMT_BY_SUFFIX = {
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.ini': 'ini',
+    '.cfg': 'ini',
+    '.conf': 'ini',
+}
+
+
+def _replace_var(context, match):
+    """Substitution callback for _VAR_RE: environment wins, then context"""
+    var_name = match.group(1) or match.group(2)
+    if var_name in os.environ:
+        return os.environ[var_name]
+    elif var_name in context:
+        return context[var_name]
+    elif match.group(2) is not None:
+        # Undefined bare $VAR stays literal (expandvars behaviour)
+        return match.group(0)
+    else:
+        # Error on undefined ${VAR}
+        raise ValueError(f"Undefined variable in override: ${{{var_name}}}")
+
+
+class _LazyExpansionContext:
+    """Expansion context over config data that expands values on first use.
+
+    Most config values are never referenced by any override, so expanding
+    them all up front when loading an override file is wasted work. Raw
+    values are indexed by env key once; expansion happens on lookup and is
+    memoized. Override values are stored directly via __setitem__.
+    """
+
+    def __init__(self, loader: 'ConfigLoader'):
+        self._expand = loader._expand
+        self._raw: Dict[str, str] = {}
+        for section_name, section_data in loader.data.items():
+            env_keys = loader._env_keys[section_name]
+            for key, value in section_data.items():
+                self._raw[env_keys[key]] = value
+        self._expanded: Dict[str, str] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._expanded or key in self._raw
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return self._expanded[key]
+        except KeyError:
+            value = self._expand(self._raw[key])
+            self._expanded[key] = value
+            return value
+
+    def __setitem__(self, key: str, value: str):
+        self._expanded[key] = value
 
 
 class ConfigLoader:
-    def __init__(self, cfg_path: str, *, expand_vars: bool = True, overrides_path: Optional[str] = None, search_paths: Optional[list[str]] = None):
+    def __init__(self, cfg_path: str, *, expand_vars: bool = True, overrides_path: Optional[str] = None, search_paths: Optional[list[str]] = None, quiet: bool = False):
         self.cfg_path = cfg_path
         self.overrides_path = overrides_path
         self.expand_vars = expand_vars
+        self.quiet = quiet
+
+        # Per-variable log lines are buffered and flushed in one write
+        self._log: list = []
         # Support additional include search path
         self.search_paths = [Path(p).resolve() for p in (search_paths or ["./config"])]
         self.file_format = self._detect_format()
@@ -21,40 +109,76 @@ class ConfigLoader:
         # Track which values are overridden
         self.overrides: Dict[str, str] = {}
 
-        # For backward compat - maintain config attribute for INI files
-        if self.file_format == 'ini':
-            # Disable interpolation to allow literal % chars
-            self.config = configparser.ConfigParser(interpolation=None)
+        # Cache include resolution - the same include can be reached many
+        # times across a deep include tree and each miss costs stat calls
+        self._include_cache: Dict[Tuple[str, Path], Path] = {}
+
+        # Shared stat results for candidate probing during include lookup
+        self._stat_cache: Dict[str, bool] = {}
 
         self._load()
+
+        # Intern section and key names: they recur across the env key
+        # table, the trie and override lookups, and interned strings hit
+        # the pointer-equality fast path in dict probes
+        self.data = {
+            sys.intern(s): {sys.intern(k): v for k, v in d.items()}
+            for s, d in self.data.items()
+        }
+
+        # Env keys are needed repeatedly for every (section, key) pair;
+        # compute them once rather than lowercasing/formatting per call
+        self._env_keys: Dict[str, Dict[str, str]] = {
+            s: {k: self._env_key(s, k) for k in d} for s, d in self.data.items()
+        }
+
+        # Every env key the config itself can produce; an override not in
+        # this set is an override-only variable
+        self._config_env_keys = frozenset(
+            k for s, d in self._env_keys.items() if s != 'env' for k in d.values()
+        ) | frozenset(self.data.get('env', ()))
+
+        # Prefix trie over underscore-split section names for _parse_env_key,
+        # plus a cache of parsed results since write_file can ask repeatedly
+        self._section_trie = self._build_section_trie()
+        self._parse_env_key_cache: Dict[str, Optional[Tuple[str, str]]] = {}
+
         if self.overrides_path:
             self._load_overrides()
 
     def _detect_format(self) -> str:
-        suffix = Path(self.cfg_path).suffix.lower()
-        if suffix in ['.yaml', '.yml']:
-            return 'yaml'
-        elif suffix in ['.ini', '.cfg', '.conf']:
-            return 'ini'
-        else:
-            # Backward compat
-            return 'ini'
+        return _FMT_BY_SUFFIX.get(os.path.splitext(self.cfg_path)[1].lower(), 'ini')
+
+    def _path_exists(self, path: str) -> bool:
+        """Existence check via a single stat, memoized per loader"""
+        cached = self._stat_cache.get(path)
+        if cached is None:
+            try:
+                os.stat(path)
+                cached = True
+            except OSError:
+                cached = False
+            self._stat_cache[path] = cached
+        return cached
 
     def _resolve_include(self, inc_name: str, parent_dir: Path) -> Path:
         """Resolve include file by trying parent dir then configured search paths."""
+        cache_key = (inc_name, parent_dir)
+        cached = self._include_cache.get(cache_key)
+        if cached is not None:
+            return cached
         # prevent absolute
         inc_rel = Path(inc_name)
         if inc_rel.is_absolute():
             raise ValueError(f"Absolute include paths not allowed (found {inc_name})")
-        # 1. parent directory
-        cand = (parent_dir / inc_rel).resolve()
-        if cand.exists():
-            return cand
-        # 2. search additional include paths
-        for base in self.search_paths:
-            cand2 = (base / inc_rel).resolve()
-            if cand2.exists():
-                return cand2
+        # Try parent directory then the additional include paths; only the
+        # winning candidate pays for a resolve()
+        for base in (parent_dir, *self.search_paths):
+            cand = base / inc_rel
+            if self._path_exists(str(cand)):
+                resolved = cand.resolve()
+                self._include_cache[cache_key] = resolved
+                return resolved
         raise FileNotFoundError(f"Included file '{inc_name}' not found (searched parent dir and {self.search_paths})")
 
     def _resolve_config_path(self) -> str:
@@ -62,15 +186,15 @@ class ConfigLoader:
         cfg_path = Path(self.cfg_path)
 
         # If absolute or relative path exists as-is, use it
-        if cfg_path.exists():
+        if self._path_exists(self.cfg_path):
             return str(cfg_path.resolve())
 
         # If relative path, try search paths
         if not cfg_path.is_absolute():
             for base in self.search_paths:
-                candidate = (base / cfg_path).resolve()
-                if candidate.exists():
-                    return str(candidate)
+                candidate = base / cfg_path
+                if self._path_exists(str(candidate)):
+                    return str(candidate.resolve())
 
         # Not found anywhere
         search_info = f" (searched {self.search_paths})" if not cfg_path.is_absolute() else ""
@@ -87,14 +211,29 @@ class ConfigLoader:
 
     def _load_yaml(self):
         """Load YAML file and convert to internal format"""
-        def _load_yaml_recursive(path: Path, visited: set) -> Dict[str, Dict[str, str]]:
-            if path in visited:
-                raise ValueError(f"Circular include detected in YAML files: {path}")
-            visited.add(path)
-
+        def _load_yaml_recursive(path: Path, in_progress: set, parsed: dict) -> Dict[str, Dict[str, str]]:
             try:
-                with open(path, 'r') as f:
-                    yaml_data = yaml.safe_load(f) or {}
+                # Read bytes in one go - libyaml decodes UTF-8 itself, so
+                # there is no need for the incremental text IO layer
+                with open(path, 'rb') as f:
+                    # Key on (device, inode) so the same file reached via
+                    # different relative chains or symlinks is recognised
+                    st = os.fstat(f.fileno())
+                    key = (st.st_dev, st.st_ino)
+                    if key in in_progress:
+                        raise ValueError(f"Circular include detected in YAML files: {path}")
+                    cached = parsed.get(key)
+                    if cached is not None:
+                        # Diamond include - reuse the parsed result
+                        return {s: dict(m) for s, m in cached.items()}
+                    in_progress.add(key)
+                    cache_key = key + (st.st_mtime_ns, st.st_size)
+                    cached_doc = _PARSE_CACHE.get(cache_key)
+                    if cached_doc is not None:
+                        yaml_data = copy.deepcopy(cached_doc)
+                    else:
+                        yaml_data = yaml.load(f.read(), Loader=_YamlLoader) or {}
+                        _PARSE_CACHE[cache_key] = copy.deepcopy(yaml_data)
             except yaml.YAMLError as e:
                 raise ValueError(f"Failed to parse YAML file {path}: {e}")
 
@@ -108,7 +247,7 @@ class ConfigLoader:
                 if not inc_file:
                     raise ValueError(f"YAML include directive in {path} missing 'file' key")
                 inc_path = self._resolve_include(inc_file, path.parent)
-                included_sections = _load_yaml_recursive(inc_path, visited)
+                included_sections = _load_yaml_recursive(inc_path, in_progress, parsed)
                 # Remove include key before merging
                 yaml_data.pop('include', None)
 
@@ -117,71 +256,114 @@ class ConfigLoader:
             for sect, sect_data in yaml_data.items():
                 if not isinstance(sect_data, dict):
                     raise ValueError(f"Section '{sect}' in {path} must be a mapping")
-                curr_sections[sect] = {k: str(v) for k, v in sect_data.items()}
-
-            # Merge: current overrides included
-            merged = {**included_sections}
+                # YAML mappings of strings are the common case; skip the
+                # str() dispatch for values that already are one
+                curr_sections[sect] = {
+                    k: (v if type(v) is str else str(v)) for k, v in sect_data.items()
+                }
+
+            # Merge: current overrides included. included_sections was built
+            # fresh for this call, so update it in place rather than copying
+            merged = included_sections
             for sect, mapping in curr_sections.items():
-                if sect not in merged:
-                    merged[sect] = {}
+                dst = merged.setdefault(sect, {})
                 for k, v in mapping.items():
-                    if sect in included_sections and k in included_sections[sect]:
-                        prev = included_sections[sect][k]
-                        if prev != v:
-                            print(
-                                f"OVR {path}: overrides [{sect}].{k} to '{v}' from '{prev}' (inherited)",
-                                file=sys.stderr,
-                            )
-                    merged[sect][k] = v
+                    prev = dst.get(k)
+                    if prev is not None and prev != v:
+                        print(
+                            f"OVR {path}: overrides [{sect}].{k} to '{v}' from '{prev}' (inherited)",
+                            file=sys.stderr,
+                        )
+                    dst[k] = v
+
+            in_progress.discard(key)
+            # Snapshot before handing back - the caller's merge mutates the
+            # inner dicts it receives
+            parsed[key] = {s: dict(m) for s, m in merged.items()}
             return merged
 
-        self.data = _load_yaml_recursive(Path(self.cfg_path).resolve(), set())
+        self.data = _load_yaml_recursive(Path(self.cfg_path).resolve(), set(), {})
 
     def _load_ini(self):
-        """Load INI file using configparser"""
-        def _load_ini_recursive(path: Path, visited: set, cfg: configparser.ConfigParser):
-            if path in visited:
-                raise ValueError(f"Circular include detected in INI files: {path}")
-            visited.add(path)
-
-            buffer_lines = []
-            with open(path, 'r') as f:
-                for line in f:
+        """Load INI file with a single-pass line scanner"""
+        def _load_ini_recursive(path: Path, in_progress: set, done: set, sections: Dict[str, Dict[str, str]]):
+            # Included files apply first, own content after, regardless of
+            # where the !include line sits - so collect own sections locally
+            # and merge them once all includes have been processed
+            own_sections: Dict[str, Dict[str, str]] = {}
+            current: Optional[Dict[str, str]] = None
+            includes: list = []
+            # One bulk read plus one C-level decode instead of per-line
+            # chunked reads through the text IO wrapper
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                key = (st.st_dev, st.st_ino)
+                if key in in_progress:
+                    raise ValueError(f"Circular include detected in INI files: {path}")
+                if key in done:
+                    # Diamond include - already merged into sections
+                    return
+                in_progress.add(key)
+                cache_key = key + (st.st_mtime_ns, st.st_size)
+                cached = _PARSE_CACHE.get(cache_key)
+                if cached is not None:
+                    content = None
+                    own_cached, includes = cached
+                    own_sections = {s: dict(m) for s, m in own_cached.items()}
+                else:
+                    content = f.read().decode('utf-8')
+            if content is None:
+                # Replay the cached include list; own content applies after
+                for inc_name in includes:
+                    inc_path = self._resolve_include(inc_name, path.parent)
+                    _load_ini_recursive(inc_path, in_progress, done, sections)
+            else:
+                for line_num, line in enumerate(content.splitlines(), 1):
                     stripped = line.strip()
-                    if stripped.startswith('!include'):
+                    if not stripped or stripped[0] in '#;':
+                        continue
+                    if stripped[0] == '!' and stripped.startswith('!include'):
                         parts = stripped.split(maxsplit=1)
                         if len(parts) != 2:
                             raise ValueError(f"Invalid !include directive in {path}: {line}")
                         inc_name = parts[1].strip()
+                        includes.append(inc_name)
                         inc_path = self._resolve_include(inc_name, path.parent)
-                        _load_ini_recursive(inc_path, visited, cfg)
-                    else:
-                        buffer_lines.append(line)
-
-            cfg.read_string(''.join(buffer_lines))
-
-        # Disable interpolation
-        self.config = configparser.ConfigParser(interpolation=None)
-        self.config.optionxform = str
-        _load_ini_recursive(Path(self.cfg_path).resolve(), set(), self.config)
-
-        for section in self.config.sections():
-            self.data[section] = dict(self.config[section].items())
+                        _load_ini_recursive(inc_path, in_progress, done, sections)
+                        continue
+                    m = _INI_SECTION_RE.match(stripped)
+                    if m:
+                        current = own_sections.setdefault(m.group(1), {})
+                        continue
+                    # key=value or key: value, whichever delimiter comes first
+                    eq = stripped.find('=')
+                    colon = stripped.find(':')
+                    if eq == -1 or (colon != -1 and colon < eq):
+                        eq = colon
+                    if eq <= 0:
+                        raise ValueError(f"Invalid line {line_num} in {path}: {stripped}")
+                    if current is None:
+                        raise ValueError(f"Key outside of any section at line {line_num} in {path}")
+                    current[stripped[:eq].strip()] = stripped[eq + 1:].strip()
+
+                _PARSE_CACHE[cache_key] = (
+                    {s: dict(m) for s, m in own_sections.items()}, includes)
+
+            in_progress.discard(key)
+            done.add(key)
+            for sect, mapping in own_sections.items():
+                sections.setdefault(sect, {}).update(mapping)
+
+        _load_ini_recursive(Path(self.cfg_path).resolve(), set(), set(), self.data)
 
     def _load_overrides(self):
         """Load override file with key=value pairs and expand variables"""
         if not self.overrides_path:
             return
 
-        if not os.path.exists(self.overrides_path):
-            raise FileNotFoundError(f"Override file not found: {self.overrides_path}")
-
-        # Build context for variable expansion from config data
-        expansion_context = {}
-        for section_name, section_data in self.data.items():
-            for key, value in section_data.items():
-                env_key = self._env_key(section_name, key)
-                expansion_context[env_key] = self._expand(value)
+        # Overrides that actually reference a variable; literal values are
+        # final as stored and need no expansion pass
+        pending_expansion = []
 
         try:
             with open(self.overrides_path, 'r') as f:
@@ -196,7 +378,7 @@ class ConfigLoader:
                         raise ValueError(f"Invalid format at line {line_num}: {line}")
 
                     key, value = line.split('=', 1)
-                    key = key.strip()
+                    key = sys.intern(key.strip())
                     value = value.strip()
 
                     # Remove quotes if present
@@ -207,13 +389,25 @@ class ConfigLoader:
 
                     # Store raw override first
                     self.overrides[key] = value
-                    # Also add to expansion context for subsequent overrides
-                    expansion_context[key] = value
+                    if '$' in value:
+                        pending_expansion.append(key)
+
+            if not pending_expansion or not self.expand_vars:
+                # Nothing to expand - skip the context entirely
+                return
 
-            # Now expand all override values in the context of config + previous overrides
+            # Context for variable expansion; config values expand on first
+            # use, with the raw overrides layered on top in file order
+            expansion_context = _LazyExpansionContext(self)
             for key, value in self.overrides.items():
+                expansion_context[key] = value
+
+            # Now expand the overrides with variables in the context of
+            # config + previous overrides; one callback serves the whole loop
+            replace = functools.partial(_replace_var, expansion_context)
+            for key in pending_expansion:
                 try:
-                    self.overrides[key] = self._expand_with_context(value, expansion_context)
+                    self.overrides[key] = _VAR_RE.sub(replace, self.overrides[key])
                     # Update context with expanded value
                     expansion_context[key] = self.overrides[key]
                 except ValueError as ve:
@@ -223,69 +417,86 @@ class ConfigLoader:
         except ValueError:
             # Re-raise ValueError (including variable expansion errors) without wrap
             raise
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Override file not found: {self.overrides_path}") from None
         except Exception as e:
             raise ValueError(f"Failed to load override file {self.overrides_path}: {e}")
 
-    def _expand_with_context(self, value: str, context: Dict[str, str]) -> str:
+    def _expand_with_context(self, value: str, context: MutableMapping[str, str]) -> str:
         """Expand variables using both environment and provided context"""
-        if not self.expand_vars:
+        if not self.expand_vars or '$' not in value:
             return value
 
-        # First expand using environment variables
-        expanded = os.path.expandvars(value)
-
-        # Now expand using our context (for variables not in environment)
-        import re
-        def replace_var(match):
-            var_name = match.group(1)
-            if var_name in os.environ:
-                return os.environ[var_name]
-            elif var_name in context:
-                return context[var_name]
-            else:
-                # Error on undefined variables
-                raise ValueError(f"Undefined variable in override: ${{{var_name}}}")
-
-        # Handle ${VAR} format
-        expanded = re.sub(r'\$\{([^}]+)\}', replace_var, expanded)
-
-        return expanded
+        # Single pass over the value: environment wins, then context
+        return _VAR_RE.sub(functools.partial(_replace_var, context), value)
 
     def _expand(self, value: str) -> str:
-        return os.path.expandvars(value) if self.expand_vars else value
+        # Most values contain no variables; a C-level substring check is
+        # far cheaper than expandvars' regex scan
+        if not self.expand_vars or '$' not in value:
+            return value
+        return os.path.expandvars(value)
 
     def _env_key(self, section: str, key: str) -> str:
         return f"IGconf_{section.lower()}_{key.lower()}"
 
+    def _build_section_trie(self) -> Dict[Any, Any]:
+        """Build a trie over underscore-split section names.
+
+        Nodes map a token to a child node; a None key marks the end of a
+        section name. Lets _parse_env_key find the section split with one
+        walk instead of rejoining candidate prefixes per split position.
+        """
+        trie: Dict[Any, Any] = {}
+        for section in self.data:
+            node = trie
+            for token in section.split('_'):
+                node = node.setdefault(token, {})
+            node[None] = True
+        return trie
+
     def _parse_env_key(self, env_key: str) -> Optional[Tuple[str, str]]:
         """Parse an environment key back to (section, key) tuple"""
+        try:
+            return self._parse_env_key_cache[env_key]
+        except KeyError:
+            pass
+        result = self._parse_env_key_uncached(env_key)
+        self._parse_env_key_cache[env_key] = result
+        return result
+
+    def _parse_env_key_uncached(self, env_key: str) -> Optional[Tuple[str, str]]:
         if not env_key.startswith("IGconf_"):
             return None
 
         # Remove our prefix
         remaining = env_key[7:]  # len("IGconf_") = 7
 
-        # Split on underscores and try to find a valid section_key combination
-        # We need to be careful because sections or keys might contain underscores
+        # Sections or keys might contain underscores, so walk the section
+        # trie and split at the first (shortest) known section name
         parts = remaining.split('_')
         if len(parts) < 2:
             return None
 
-        # Try different combinations, starting with the assumption that
-        # the last part is the key and everything before is the section
-        for i in range(1, len(parts)):
-            potential_section = '_'.join(parts[:i])
-            potential_key = '_'.join(parts[i:])
-
-            # Check if this section exists in our data
-            if potential_section in self.data:
-                return (potential_section, potential_key)
+        node = self._section_trie
+        for i, token in enumerate(parts[:-1], 1):
+            node = node.get(token)
+            if node is None:
+                break
+            if None in node:
+                return ('_'.join(parts[:i]), '_'.join(parts[i:]))
 
         # If no matching section found, assume single-part section name
-        if len(parts) >= 2:
-            return (parts[0], '_'.join(parts[1:]))
+        return (parts[0], '_'.join(parts[1:]))
+
+    def _log_line(self, line: str):
+        self._log.append(line)
 
-        return None
+    def _flush_log(self):
+        if self._log:
+            if not self.quiet:
+                sys.stdout.write('\n'.join(self._log) + '\n')
+            self._log.clear()
 
     def _set_env_if_unset(self, env_key: str, value: str):
         if env_key not in os.environ:
@@ -293,62 +504,57 @@ class ConfigLoader:
             if env_key in self.overrides:
                 final_value = self._expand(self.overrides[env_key])
                 os.environ[env_key] = final_value
-                print(f"OVR {env_key}={final_value}")
+                self._log_line(f"OVR {env_key}={final_value}")
             else:
                 final_value = self._expand(value)
                 os.environ[env_key] = final_value
-                print(f"CFG {env_key}={final_value}")
+                self._log_line(f"CFG {env_key}={final_value}")
         else:
-            print(f"{env_key} already set, skipping")
+            self._log_line(f"{env_key} already set, skipping")
 
     def _get_value(self, env_key: str, cfg_value: str) -> str:
         return os.environ.get(env_key, self._expand(cfg_value))
 
     def load_section(self, section: str):
+        self._load_section(section)
+        self._flush_log()
+
+    def _load_section(self, section: str):
         if section not in self.data:
             raise ValueError(f"Section [{section}] not found in {self.cfg_path}")
         if section.lower() == "env":
             self._load_env_section()
             return
+        env_keys = self._env_keys[section]
         for key, value in self.data[section].items():
-            self._set_env_if_unset(self._env_key(section, key), self._expand(value))
+            self._set_env_if_unset(env_keys[key], self._expand(value))
 
     def load_all(self):
         # Load [env] section first so that downstream config can rely on it
         if "env" in self.data:
-            self.load_section("env")
+            self._load_section("env")
         for section in self.data.keys():
             if section == "env":
                 continue
-            self.load_section(section)
+            self._load_section(section)
 
         # Process override variables that don't correspond to config file entries
         self._load_override_only_variables()
+        self._flush_log()
 
     def _load_override_only_variables(self):
         """Process override variables that don't correspond to any config file entries"""
         if not self.overrides:
             return
 
-        # Build set of all environment keys that were processed from config file
-        processed_env_keys = set()
-        if "env" in self.data:
-            processed_env_keys.update(self.data["env"].keys())
-        for section_name, section_data in self.data.items():
-            if section_name == "env":
-                continue
-            for key in section_data.keys():
-                env_key = self._env_key(section_name, key)
-                processed_env_keys.add(env_key)
-
         # Process any override variables that weren't in the config file
         for override_key, override_value in self.overrides.items():
-            if override_key not in processed_env_keys:
+            if override_key not in self._config_env_keys:
                 self._set_env_if_unset(override_key, override_value)
 
-    def _write_var(self, file_handle, section: str, key: str, value: str):
+    def _write_var(self, out_lines: list, log_lines: list, section: str, key: str, value: str):
         """Write variable to file, use env value else override value else config value"""
-        env_key = self._env_key(section, key)
+        env_key = self._env_keys[section][key]
 
         # Check precedence: environment -> override -> config
         if env_key in os.environ:
@@ -361,43 +567,51 @@ class ConfigLoader:
             effective_value = self._expand(value)
             source = "config"
 
-        file_handle.write(f'{env_key}="{effective_value}"\n')
+        out_lines.append(f'{env_key}="{effective_value}"\n')
 
         # Use same output format as _set_env_if_unset for consistency
         if source == "env":
-            print(f"ENV {env_key}={effective_value}")
+            log_lines.append(f"ENV {env_key}={effective_value}\n")
         elif source == "override":
-            print(f"OVR {env_key}={effective_value}")
+            log_lines.append(f"OVR {env_key}={effective_value}\n")
         else:
-            print(f"CFG {env_key}={effective_value}")
+            log_lines.append(f"CFG {env_key}={effective_value}\n")
 
     def write_file(self, file_path: str, section: Optional[str] = None):
+        # Accumulate output and console lines, then write each in one go
+        # rather than one syscall-sized chunk per key
+        out_lines: list = []
+        log_lines: list = []
+        processed_env_keys = set()
+
+        # First, process all keys from the config file
+        sections = [section] if section else list(self.data.keys())
+        if section is None and "env" in self.data:
+            self._write_env_section(out_lines, log_lines, processed_env_keys, None)
+        for sect in sections:
+            if sect not in self.data:
+                raise ValueError(f"Section [{sect}] not found in {self.cfg_path}")
+            if sect == "env":
+                if section is not None:
+                    self._write_env_section(out_lines, log_lines, processed_env_keys, section)
+                continue
+            env_keys = self._env_keys[sect]
+            for key, value in self.data[sect].items():
+                processed_env_keys.add(env_keys[key])
+                self._write_var(out_lines, log_lines, sect, key, value)
+
+        # Then, process any override-only keys that weren't in the config file
+        for override_key in self.overrides:
+            if override_key not in processed_env_keys:
+                # For override-only variables, write them directly
+                self._write_override_only_var(out_lines, log_lines, override_key, section)
+
         with open(file_path, 'w') as f:
-            processed_env_keys = set()
-
-            # First, process all keys from the config file
-            sections = [section] if section else list(self.data.keys())
-            if section is None and "env" in self.data:
-                self._write_env_section(f, processed_env_keys, None)
-            for sect in sections:
-                if sect not in self.data:
-                    raise ValueError(f"Section [{sect}] not found in {self.cfg_path}")
-                if sect == "env":
-                    if section is not None:
-                        self._write_env_section(f, processed_env_keys, section)
-                    continue
-                for key, value in self.data[sect].items():
-                    env_key = self._env_key(sect, key)
-                    processed_env_keys.add(env_key)
-                    self._write_var(f, sect, key, value)
-
-            # Then, process any override-only keys that weren't in the config file
-            for override_key in self.overrides:
-                if override_key not in processed_env_keys:
-                    # For override-only variables, write them directly
-                    self._write_override_only_var(f, override_key, section)
-
-    def _write_override_only_var(self, file_handle, override_key: str, section_filter: Optional[str]):
+            f.write(''.join(out_lines))
+        if log_lines and not self.quiet:
+            sys.stdout.write(''.join(log_lines))
+
+    def _write_override_only_var(self, out_lines: list, log_lines: list, override_key: str, section_filter: Optional[str]):
         """Write an override-only variable that doesn't exist in config file"""
         # Check precedence: environment -> override
         if override_key in os.environ:
@@ -420,20 +634,20 @@ class ConfigLoader:
             if section_filter is not None and section_filter != "env":
                 return
 
-        file_handle.write(f'{override_key}="{effective_value}"\n')
+        out_lines.append(f'{override_key}="{effective_value}"\n')
 
-        # Print to console for consistency
+        # Log for consistency
         if source == "env":
-            print(f"ENV {override_key}={effective_value}")
+            log_lines.append(f"ENV {override_key}={effective_value}\n")
         else:
-            print(f"OVR {override_key}={effective_value}")
+            log_lines.append(f"OVR {override_key}={effective_value}\n")
 
     def _load_env_section(self):
         for key, value in self.data.get("env", {}).items():
             existing = os.environ.get(key)
 
             if existing is not None and key not in self.overrides:
-                print(f"ENV {key}={existing} (preserved)")
+                self._log_line(f"ENV {key}={existing} (preserved)")
                 continue
 
             if key in self.overrides:
@@ -444,9 +658,9 @@ class ConfigLoader:
                 label = "CFG"
 
             os.environ[key] = final_value
-            print(f"{label} {key}={final_value}")
+            self._log_line(f"{label} {key}={final_value}")
 
-    def _write_env_section(self, file_handle, processed_env_keys: set, section_filter: Optional[str]):
+    def _write_env_section(self, out_lines: list, log_lines: list, processed_env_keys: set, section_filter: Optional[str]):
         if section_filter is not None and section_filter != "env":
             return
         for key, value in self.data.get("env", {}).items():
@@ -460,13 +674,13 @@ class ConfigLoader:
             else:
                 effective_value = self._expand(value)
                 source = "config"
-            file_handle.write(f'{key}="{effective_value}"\n')
+            out_lines.append(f'{key}="{effective_value}"\n')
             if source == "env":
-                print(f"ENV {key}={effective_value}")
+                log_lines.append(f"ENV {key}={effective_value}\n")
             elif source == "override":
-                print(f"OVR {key}={effective_value}")
+                log_lines.append(f"OVR {key}={effective_value}\n")
             else:
-                print(f"CFG {key}={effective_value}")
+                log_lines.append(f"CFG {key}={effective_value}\n")
 
 
 def ConfigLoader_register_parser(subparsers):
@@ -479,6 +693,7 @@ def ConfigLoader_register_parser(subparsers):
     parser.add_argument("--overrides", metavar="FILE", help="Override file with key=value pairs")
     parser.add_argument("--gen", action="store_true", help="Generate example .ini and .yaml with include syntax")
     parser.add_argument("--migrate", action="store_true", help="Convert INI to YAML and write to stdout")
+    parser.add_argument("--quiet", action="store_true", help="Suppress per-variable output")
     parser.set_defaults(func=_main)
 
 
@@ -500,6 +715,7 @@ def _main(args):
         expand_vars=not args.no_expand,
         overrides_path=args.overrides,
         search_paths=(args.path.split(":") if args.path else ["./config"]),
+        quiet=args.quiet,
     )
     if args.write_to:
         loader.write_file(args.write_to, args.section)
@@ -512,35 +728,29 @@ def _main(args):
 
 def _migrate_to_yaml(ini_path: str, args):
     """Migrate INI syntax file to YAML and write to stdout"""
-    from pathlib import Path
-
     yaml_data = {}
     includes = []
 
     # Parse the original file to extract includes and sections
-    ini_file = Path(ini_path)
     current_section = None
 
-    with open(ini_file, 'r') as f:
+    with open(ini_path, 'r') as f:
         for line in f:
-            stripped = line.strip()
-            if stripped.startswith('!include'):
-                parts = stripped.split(maxsplit=1)
-                if len(parts) == 2:
-                    inc_name = parts[1].strip()
-                    # Convert .cfg to .yaml extension for the include
-                    if inc_name.endswith('.cfg'):
-                        inc_name = inc_name[:-4] + '.yaml'
-                    includes.append(inc_name)
-            elif stripped.startswith('[') and stripped.endswith(']'):
-                current_section = stripped[1:-1]
-            elif stripped and not stripped.startswith('#') and '=' in stripped and current_section:
-                key, value = stripped.split('=', 1)
-                key = key.strip()
-                value = value.strip()
+            m = _INI_LINE.match(line)
+            if not m:
+                continue
+            inc_name, section, key, value = m.groups()
+            if inc_name is not None:
+                # Convert .cfg to .yaml extension for the include
+                if inc_name.endswith('.cfg'):
+                    inc_name = inc_name[:-4] + '.yaml'
+                includes.append(inc_name)
+            elif section is not None:
+                current_section = section
+            elif current_section:
                 if current_section not in yaml_data:
                     yaml_data[current_section] = {}
-                yaml_data[current_section][key] = value
+                yaml_data[current_section][key.strip()] = value.strip()
 
     # Write the YAML output
     print("# Generated by rpi-image-gen config --migrate")
@@ -555,7 +765,7 @@ def _migrate_to_yaml(ini_path: str, args):
 
     # sections
     if yaml_data:
-        yaml.dump(yaml_data, sys.stdout, default_flow_style=False, sort_keys=False, indent=2)
+        yaml.dump(yaml_data, sys.stdout, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False, indent=2)
 
 
 def _generate_boilerplate():
@@ -1,7 +1,72 @@
+import functools
+import operator
+import os
 import re
+import sys
 from typing import List, Optional, Dict, Any, Tuple
 from validators import BaseValidator, parse_validator
 
+# Validator instances are immutable after construction, so identical rule
+# strings (repeated across many layers) can share one parsed instance.
+_parse_validator = functools.lru_cache(maxsize=1024)(parse_validator)
+
+
+# Compiled once at import - these run for every dependency token and every
+# metadata string, so per-call re.compile/re.search would dominate parsing.
+_WS_RE = re.compile(r"\s")
+_DEP_SPLIT_RE = re.compile(r"\s*,\s*")
+_DEP_DOC_RE = re.compile(r'^[A-Za-z0-9_${}-]+$')
+_DEP_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+_ENV_VAR_RE = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+# Matches an escaped \${ (group 1, kept as a literal ${ without the backslash)
+# or a plain ${NAME} placeholder (group 2, substituted).
+_PLACEHOLDER_RE = re.compile(r"\\(\$\{)|\$\{([A-Z][A-Z0-9_]*)\}")
+
+# Canonical Set policy per accepted spelling; anything else means immediate.
+_POLICY_MAP = {
+    "false": "skip", "0": "skip", "no": "skip", "n": "skip",
+    "lazy": "lazy",
+    "force": "force",
+    "true": "immediate", "1": "immediate", "yes": "immediate",
+    "y": "immediate", "immediate": "immediate",
+}
+
+
+_LAYER_FIELD_SCHEMA: Optional[Tuple[frozenset, Tuple[str, ...]]] = None
+
+
+def _layer_field_schema() -> Optional[Tuple[frozenset, Tuple[str, ...]]]:
+    """Split SUPPORTED_FIELD_PATTERNS into exact names and wildcard prefixes.
+
+    Imported lazily to avoid a circular import with metadata_parser and
+    computed once; returns None if the schema is unavailable.
+    """
+    global _LAYER_FIELD_SCHEMA
+    if _LAYER_FIELD_SCHEMA is None:
+        try:
+            from metadata_parser import SUPPORTED_FIELD_PATTERNS
+        except ImportError:
+            return None
+        exact = frozenset(k for k in SUPPORTED_FIELD_PATTERNS if '*' not in k)
+        prefixes = tuple(k.split('*')[0] for k in SUPPORTED_FIELD_PATTERNS if '*' in k)
+        _LAYER_FIELD_SCHEMA = (exact, prefixes)
+    return _LAYER_FIELD_SCHEMA
+
+
+@functools.lru_cache(maxsize=1024)
+def _placeholders_for(filepath: str) -> Dict[str, str]:
+    """Placeholder values for a file, memoized per path.
+
+    Callers only read the returned dict, so sharing one instance per
+    filepath across containers is safe.
+    """
+    abs_path = os.path.abspath(filepath)
+    return {
+        "FILENAME": os.path.basename(abs_path),
+        "DIRECTORY": os.path.dirname(abs_path),
+        "FILEPATH": abs_path,
+    }
+
 
 # X-Env field helpers
 class XEnv:
@@ -11,31 +76,38 @@ class XEnv:
     LAYER_PREFIX = "X-Env-Layer-"
 
     # === VARIABLE FIELD METHODS ===
+    # Static + cached: the same variable names are looked up repeatedly while
+    # parsing and resolving, so the formatted field names are memoized.
 
-    @classmethod
-    def var_base(cls, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def var_base(name: str) -> str:
         """Build base variable field name: X-Env-Var-{name}"""
-        return f"{cls.VAR_PREFIX}{name.upper()}"
+        return f"{XEnv.VAR_PREFIX}{name.upper()}"
 
-    @classmethod
-    def var_desc(cls, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def var_desc(name: str) -> str:
         """Build description field name: X-Env-Var-{name}-Desc"""
-        return f"{cls.VAR_PREFIX}{name.upper()}-Desc"
+        return f"{XEnv.VAR_PREFIX}{name.upper()}-Desc"
 
-    @classmethod
-    def var_required(cls, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def var_required(name: str) -> str:
         """Build required field name: X-Env-Var-{name}-Required"""
-        return f"{cls.VAR_PREFIX}{name.upper()}-Required"
+        return f"{XEnv.VAR_PREFIX}{name.upper()}-Required"
 
-    @classmethod
-    def var_valid(cls, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def var_valid(name: str) -> str:
         """Build validation field name: X-Env-Var-{name}-Valid"""
-        return f"{cls.VAR_PREFIX}{name.upper()}-Valid"
+        return f"{XEnv.VAR_PREFIX}{name.upper()}-Valid"
 
-    @classmethod
-    def var_set(cls, name: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def var_set(name: str) -> str:
         """Build set policy field name: X-Env-Var-{name}-Set"""
-        return f"{cls.VAR_PREFIX}{name.upper()}-Set"
+        return f"{XEnv.VAR_PREFIX}{name.upper()}-Set"
 
     # === PATTERN METHODS FOR SUPPORTED_FIELD_PATTERNS ===
 
@@ -109,14 +181,9 @@ class XEnv:
         """Extract base variable name from any X-Env-Var field (base or attribute)."""
         if not cls.is_var_field(field_name):
             return None
-        var_part = field_name[len(cls.VAR_PREFIX):]
-
-        # If it's a base field, return as-is
-        if '-' not in var_part:
-            return var_part
-
-        # If it's an attribute field, extract the base part
-        return var_part.split('-')[0]
+        # One scan: the base name is everything before the first dash, and a
+        # base field (no dash) partitions to itself.
+        return field_name[len(cls.VAR_PREFIX):].partition('-')[0]
 
     @classmethod
     def parse_var_field(cls, field_name: str) -> Optional[Tuple[str, Optional[str]]]:
@@ -131,18 +198,14 @@ class XEnv:
         if not cls.is_var_field(field_name):
             return None
 
-        var_part = field_name[len(cls.VAR_PREFIX):]
+        base, sep, suffix = field_name[len(cls.VAR_PREFIX):].partition('-')
 
-        if '-' not in var_part:
+        if not sep:
             # Base variable field
-            return (var_part, None)
-
-        # Attribute field - split on first dash
-        parts = var_part.split('-', 1)
-        if len(parts) == 2:
-            return (parts[0], f"-{parts[1]}")
+            return (base, None)
 
-        return (var_part, None)
+        # Attribute field - suffix keeps its leading dash
+        return (base, f"-{suffix}")
 
     # === LAYER FIELD METHODS ===
 
@@ -202,9 +265,31 @@ class XEnv:
         return field_name.startswith(cls.LAYER_PREFIX)
 
 
+# Hot loops check field prefixes directly against these instead of going
+# through the XEnv method wrappers, which cost a bound-method call each.
+_VAR_PREFIX = XEnv.VAR_PREFIX
+_VAR_PREFIX_LEN = len(XEnv.VAR_PREFIX)
+
+# Layer field names evaluated once; the builder methods format a fresh string
+# on every call, which adds up when parsing many layer files.
+_LAYER_NAME = XEnv.layer_name()
+_LAYER_DESC = XEnv.layer_description()
+_LAYER_VERSION = XEnv.layer_version()
+_LAYER_CATEGORY = XEnv.layer_category()
+_LAYER_TYPE = XEnv.layer_type()
+_LAYER_GENERATOR = XEnv.layer_generator()
+_LAYER_REQUIRES = XEnv.layer_requires()
+_LAYER_PROVIDES = XEnv.layer_provides()
+_LAYER_REQUIRES_PROVIDER = XEnv.layer_requires_provider()
+_LAYER_CONFLICTS = XEnv.layer_conflicts()
+
+
 class EnvVariable:
     """Represents an environment variable with its metadata and validation rules."""
 
+    __slots__ = ("name", "value", "description", "required", "validator",
+                 "validation_rule", "set_policy", "source_layer", "position")
+
     def __init__(self, name: str, value: str = "", description: str = "",
                  required: bool = False, validator: Optional[BaseValidator] = None,
                  validation_rule: str = "", set_policy: str = "immediate",
@@ -215,41 +300,56 @@ class EnvVariable:
         self.required = required
         self.validator = validator
         self.validation_rule = validation_rule  # Original validation rule string
-        self.set_policy = set_policy  # immediate, lazy, force, skip
-        self.source_layer = source_layer  # Layer that defined this variable
+        # Policy and layer names repeat across many instances - intern them so
+        # equality checks during resolution compare by pointer.
+        self.set_policy = sys.intern(set_policy)  # immediate, lazy, force, skip
+        self.source_layer = sys.intern(source_layer)  # Layer that defined this variable
         self.position = position  # Order within dependency processing
 
     @classmethod
     def from_metadata_fields(cls, var_name: str, metadata_dict: Dict[str, str],
                            prefix: str = "", source_layer: str = "", position: int = 0) -> 'EnvVariable':
-        """Create an EnvVariable from metadata fields."""
-        # Extract the base variable name (without X-Env-Var- prefix)
-        base_name = var_name.upper()
-
-        # Get the basic variable definition
-        var_key = XEnv.var_base(base_name)
-        value = metadata_dict.get(var_key, "")
+        """Create an EnvVariable from metadata fields.
 
-        # Get additional attributes
-        desc_key = XEnv.var_desc(base_name)
-        description = metadata_dict.get(desc_key, "")
+        Convenience wrapper over from_bucket() for callers holding a full
+        metadata dict rather than pre-grouped attribute buckets.
+        """
+        base_name = var_name.upper()
+        bucket = {}
+        for suffix, key in (("", XEnv.var_base(base_name)),
+                            ("Desc", XEnv.var_desc(base_name)),
+                            ("Required", XEnv.var_required(base_name)),
+                            ("Valid", XEnv.var_valid(base_name)),
+                            ("Set", XEnv.var_set(base_name))):
+            if key in metadata_dict:
+                bucket[suffix] = metadata_dict[key]
+        return cls.from_bucket(var_name, bucket, prefix=prefix,
+                               source_layer=source_layer, position=position)
+
+    @classmethod
+    def from_bucket(cls, var_name: str, bucket: Dict[str, str],
+                    prefix: str = "", source_layer: str = "", position: int = 0) -> 'EnvVariable':
+        """Create an EnvVariable from a pre-grouped bucket of attribute fields.
+
+        The bucket maps attribute suffix ("" for the base definition, "Desc",
+        "Required", "Valid", "Set") to the raw field value, avoiding repeated
+        full-field-name lookups against the metadata dict.
+        """
+        value = bucket.get("", "")
+        description = bucket.get("Desc", "")
 
-        required_key = XEnv.var_required(base_name)
-        required_str = metadata_dict.get(required_key, "false")
+        required_str = bucket.get("Required", "false")
         required = required_str.lower() in ("true", "1", "yes", "y")
 
-        valid_key = XEnv.var_valid(base_name)
-        valid_rule = metadata_dict.get(valid_key, "")
+        valid_rule = bucket.get("Valid", "")
         validator = None
         if valid_rule:
             try:
-                validator = parse_validator(valid_rule)
+                validator = _parse_validator(valid_rule)
             except ValueError as e:
                 raise ValueError(f"Invalid validation rule '{valid_rule}' for variable {var_name}: {e}")
 
-        set_key = XEnv.var_set(base_name)
-        set_raw = metadata_dict.get(set_key, "immediate")
-        set_policy = cls._parse_set_policy(set_raw)
+        set_policy = cls._parse_set_policy(bucket.get("Set", "immediate"))
 
         # Calculate full variable name
         full_name = f"IGconf_{prefix}_{var_name.lower()}" if prefix else var_name
@@ -271,16 +371,10 @@ class EnvVariable:
         """Parse Set policy value into canonical form."""
         if value is None:
             return "immediate"
-        val = str(value).strip().lower()
-
-        if val in ["false", "0", "no", "n"]:
-            return "skip"
-        elif val == "lazy":
-            return "lazy"
-        elif val == "force":
-            return "force"
-        else:  # true, 1, yes, y, immediate, or anything else
-            return "immediate"
+        if type(value) is not str:
+            value = str(value)
+        # Unknown spellings fall through to immediate
+        return _POLICY_MAP.get(value.strip().lower(), "immediate")
 
     def validate_value(self, value: Optional[str] = None) -> List[str]:
         """Validate a value against this variable's validation rule."""
@@ -307,6 +401,10 @@ class EnvVariable:
 class EnvLayer:
     """Represents a layer with its dependencies and metadata."""
 
+    __slots__ = ("name", "description", "version", "category", "deps",
+                 "provides", "requires_provider", "conflicts", "layer_type",
+                 "generator", "config_file")
+
     def __init__(self, name: str, description: str = "", version: str = "1.0.0",
                  category: str = "general", deps: List[str] = None,
                  provides: List[str] = None, requires_provider: List[str] = None,
@@ -329,38 +427,37 @@ class EnvLayer:
                            filepath: str = "", doc_mode: bool = False) -> Optional['EnvLayer']:
         """Create an EnvLayer from metadata fields."""
         # Check if this has layer information
-        layer_name = metadata_dict.get(XEnv.layer_name(), "")
+        layer_name = metadata_dict.get(_LAYER_NAME, "")
         if not layer_name:
             return None
 
         # Validate all X-Env-Layer fields against supported schema
         cls._validate_layer_fields(metadata_dict, filepath)
 
-        description = metadata_dict.get(XEnv.layer_description(), "")
-        version = metadata_dict.get(XEnv.layer_version(), "1.0.0")
-        category = metadata_dict.get(XEnv.layer_category(), "general")
-        layer_type = metadata_dict.get(XEnv.layer_type(), "static").strip().lower() or "static"
-        generator = metadata_dict.get(XEnv.layer_generator(), "").strip()
+        description = metadata_dict.get(_LAYER_DESC, "")
+        version = metadata_dict.get(_LAYER_VERSION, "1.0.0")
+        category = metadata_dict.get(_LAYER_CATEGORY, "general")
+        layer_type = metadata_dict.get(_LAYER_TYPE, "static").strip().lower() or "static"
+        generator = metadata_dict.get(_LAYER_GENERATOR, "").strip()
         if layer_type not in ("static", "dynamic"):
             raise ValueError(f"Invalid layer type '{layer_type}' in {filepath}")
         if layer_type == "dynamic" and not generator:
             raise ValueError(f"Layer '{layer_name}' marked dynamic but no X-Env-Layer-Generator specified")
 
         # Parse dependency lists
-        requires_str = metadata_dict.get(XEnv.layer_requires(), "")
+        requires_str = metadata_dict.get(_LAYER_REQUIRES, "")
         requires = cls._parse_dependency_list(requires_str, doc_mode)
 
-        provides_str = metadata_dict.get(XEnv.layer_provides(), "")
+        provides_str = metadata_dict.get(_LAYER_PROVIDES, "")
         provides = cls._parse_dependency_list(provides_str, doc_mode)
 
-        requires_provider_str = metadata_dict.get(XEnv.layer_requires_provider(), "")
+        requires_provider_str = metadata_dict.get(_LAYER_REQUIRES_PROVIDER, "")
         requires_provider = cls._parse_dependency_list(requires_provider_str, doc_mode)
 
-        conflicts_str = metadata_dict.get(XEnv.layer_conflicts(), "")
+        conflicts_str = metadata_dict.get(_LAYER_CONFLICTS, "")
         conflicts = cls._parse_dependency_list(conflicts_str, doc_mode)
 
         # Infer config file from filepath if not provided
-        import os
         config_file = os.path.basename(filepath) if filepath else f"{layer_name}.yaml"
 
         return cls(
@@ -383,23 +480,23 @@ class EnvLayer:
         if not depends_str.strip():
             return []
 
-        import re
         deps = []
-        for dep in depends_str.split(','):
-            dep_name = dep.strip()
+        # Splitting on comma-with-surrounding-whitespace strips each token in
+        # the same pass; the ends are handled by the outer strip.
+        for dep_name in _DEP_SPLIT_RE.split(depends_str.strip()):
             if dep_name:
                 # Find and evaluate environment variables in dependency names
                 if '${' in dep_name:
                     dep_name = EnvLayer._evaluate_env_variables(dep_name, doc_mode)
 
                 # Validate dependency name format
-                if re.search(r"\s", dep_name):
+                if _WS_RE.search(dep_name):
                     raise ValueError(
                         f"Invalid dependency token '{dep_name}' - dependencies must be comma-separated without spaces/newlines inside a token")
                 # In doc_mode, allow environment variable placeholders like ${VAR}-suffix
-                if doc_mode and not re.match(r'^[A-Za-z0-9_${}-]+$', dep_name):
+                if doc_mode and not _DEP_DOC_RE.match(dep_name):
                     raise ValueError(f"Invalid dependency name '{dep_name}' - only alphanum, dash, underscore, and environment variable placeholders allowed")
-                elif not doc_mode and not re.match(r'^[A-Za-z0-9_-]+$', dep_name):
+                elif not doc_mode and not _DEP_RE.match(dep_name):
                     raise ValueError(f"Invalid dependency name '{dep_name}' - only alphanum, dash, underscore allowed")
                 deps.append(dep_name)
         return deps
@@ -410,9 +507,8 @@ class EnvLayer:
         Raises on missing variables unless doc_mode=True (in which case placeholders are kept).
         - Iteratively expands (with cap) to support nested placeholders.
         """
-        import os
-        # Vatiables much conform to this regex
-        pattern = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+        # Variables must conform to _ENV_VAR_RE
+        pattern = _ENV_VAR_RE
 
         previous = text
         max_iterations = 10
@@ -435,28 +531,17 @@ class EnvLayer:
     @classmethod
     def _validate_layer_fields(cls, metadata_dict: Dict[str, str], filepath: str = "") -> None:
         """Validate that all X-Env-Layer fields are supported according to the schema"""
-        # Import here to avoid circular imports
-        try:
-            from metadata_parser import SUPPORTED_FIELD_PATTERNS
-        except ImportError:
+        schema = _layer_field_schema()
+        if schema is None:
             # If we can't import the schema, skip validation
             return
+        exact_fields, pattern_prefixes = schema
 
-        # Get all X-Env-Layer fields from metadata
-        layer_fields = {key: value for key, value in metadata_dict.items()
-                       if key.startswith(XEnv.LAYER_PREFIX)}
-
-        # Check each field against supported patterns
-        for field_name in layer_fields.keys():
-            if field_name not in SUPPORTED_FIELD_PATTERNS:
-                # Check if it matches any pattern-based fields (shouldn't for layers, but be thorough)
-                supported = False
-                for pattern_key in SUPPORTED_FIELD_PATTERNS.keys():
-                    if '*' in pattern_key and field_name.startswith(pattern_key.split('*')[0]):
-                        supported = True
-                        break
-
-                if not supported:
+        # Check each X-Env-Layer field against supported names and patterns
+        for field_name in metadata_dict:
+            if field_name.startswith(XEnv.LAYER_PREFIX) and field_name not in exact_fields:
+                # Pattern-based fields shouldn't occur for layers, but be thorough
+                if not field_name.startswith(pattern_prefixes):
                     filename = filepath.split('/')[-1] if filepath else "unknown"
                     raise ValueError(f"Unsupported layer field '{field_name}' in {filename}")
 
@@ -488,6 +573,9 @@ class EnvLayer:
 class MetadataContainer:
     """Container for parsed metadata with variables and layer information."""
 
+    __slots__ = ("filepath", "variables", "layer", "var_prefix",
+                 "required_vars", "optional_vars", "raw_metadata")
+
     def __init__(self, filepath: str = ""):
         self.filepath = filepath
         self.variables: Dict[str, EnvVariable] = {}
@@ -499,10 +587,15 @@ class MetadataContainer:
 
     @classmethod
     def from_metadata_dict(cls, metadata_dict: Dict[str, str],
-                          filepath: str = "", doc_mode: bool = False) -> 'MetadataContainer':
-        """Create a MetadataContainer from a metadata dictionary."""
+                          filepath: str = "", doc_mode: bool = False,
+                          take_ownership: bool = False) -> 'MetadataContainer':
+        """Create a MetadataContainer from a metadata dictionary.
+
+        With take_ownership=True the container adopts metadata_dict directly
+        (the caller must not reuse it) instead of copying it defensively.
+        """
         container = cls(filepath)
-        container.raw_metadata = metadata_dict.copy()
+        container.raw_metadata = metadata_dict if take_ownership else metadata_dict.copy()
 
         # Apply placeholder substitution to the metadata
         container.apply_placeholders()
@@ -513,24 +606,37 @@ class MetadataContainer:
         # Extract layer information
         container.layer = EnvLayer.from_metadata_fields(container.raw_metadata, filepath, doc_mode)
 
-        # Extract variables
-        for key in container.raw_metadata.keys():
-            if XEnv.is_base_var_field(key):
-                # This is a base variable definition
-                var_name = XEnv.extract_base_var_name(key)
-                try:
-                    # Note: source_layer and position will be set later by LayerManager
-                    env_var = EnvVariable.from_metadata_fields(
-                        var_name, container.raw_metadata, container.var_prefix,
-                        source_layer="", position=0
-                    )
-                    container.variables[env_var.name] = env_var
-                except ValueError as e:
-                    # Re-raise to fail layer loading
-                    raise ValueError(f"Invalid specifier for variable {var_name}: {e}")
-                except Exception as e:
-                    # Skip other types of errors - they'll be caught during validation
-                    pass
+        # Extract variables: group all X-Env-Var fields by base name in a
+        # single pass instead of probing the dict per attribute per variable.
+        buckets: Dict[str, Dict[str, str]] = {}
+        base_order: List[str] = []
+        for key, value in container.raw_metadata.items():
+            if not key.startswith(_VAR_PREFIX):
+                continue
+            var_part = key[_VAR_PREFIX_LEN:]
+            base, _, suffix = var_part.partition('-')
+            # Interned so the bucket keys for a variable's attribute fields
+            # all share one string object.
+            base = sys.intern(base)
+            if not suffix:
+                # Base variable definition - remember declaration order
+                base_order.append(base)
+            buckets.setdefault(base, {})[suffix] = value
+
+        for var_name in base_order:
+            try:
+                # Note: source_layer and position will be set later by LayerManager
+                env_var = EnvVariable.from_bucket(
+                    var_name, buckets[var_name], container.var_prefix,
+                    source_layer="", position=0
+                )
+                container.variables[env_var.name] = env_var
+            except ValueError as e:
+                # Re-raise to fail layer loading
+                raise ValueError(f"Invalid specifier for variable {var_name}: {e}")
+            except Exception as e:
+                # Skip other types of errors - they'll be caught during validation
+                pass
 
         # Extract required/optional environment variable lists
         required_vars_str = container.raw_metadata.get(XEnv.var_requires(), "")
@@ -554,37 +660,31 @@ class MetadataContainer:
 
     def _build_placeholders(self) -> Dict[str, str]:
         """Return dict with placeholder values for this file."""
-        import os
-        abs_path = os.path.abspath(self.filepath)
-        return {
-            "FILENAME": os.path.basename(abs_path),
-            "DIRECTORY": os.path.dirname(abs_path),
-            "FILEPATH": abs_path,
-        }
+        return _placeholders_for(self.filepath)
 
     def _substitute_placeholders(self, text: str, placeholders: Dict[str, str]) -> str:
         """Replace ${NAME} in text with corresponding placeholder."""
         if "${" not in text:
             return text
 
-        # Handle escaped \${...}
-        ESCAPE_TOKEN = "<<LITERAL_DOLLAR_BRACE>>"
-        text_escaped = text.replace("\\${", ESCAPE_TOKEN)
-
         def _repl(match):
-            key = match.group(1)
-            return placeholders.get(key, match.group(0))
+            if match.group(1) is not None:
+                # \${ stays literal, minus the escaping backslash
+                return "${"
+            return placeholders.get(match.group(2), match.group(0))
 
-        substituted = re.sub(r"\$\{([A-Z][A-Z0-9_]*)\}", _repl, text_escaped)
-        return substituted.replace(ESCAPE_TOKEN, "${")
+        return _PLACEHOLDER_RE.sub(_repl, text)
 
     def apply_placeholders(self):
         """Walk metadata and substitute placeholders in all string fields."""
-        placeholders = self._build_placeholders()
-
-        if not self.raw_metadata:
+        # Most files carry no placeholders at all - skip the path expansion
+        # and the per-field substitution entirely in that case.
+        if not any(isinstance(val, str) and "${" in val
+                   for val in self.raw_metadata.values()):
             return
 
+        placeholders = self._build_placeholders()
+
         for key in list(self.raw_metadata.keys()):
             val = self.raw_metadata[key]
             if isinstance(val, str):
@@ -613,21 +713,25 @@ class VariableResolver:
         Returns:
             Dict mapping variable names to the resolved EnvVariable instance in layer dependency order
         """
-        import os
         resolved = {}
 
-        # Get all variables and sort by their earliest position to maintain layer dependency order
+        # Environment membership is stable for the duration of the call, so
+        # snapshot it once instead of probing os.environ per variable.
+        env_keys = frozenset(os.environ)
+
+        # Resolve each variable in a single pass over its definitions,
+        # collecting the earliest position alongside the policy outcome.
         all_vars = []
         for var_name, definitions in variable_definitions.items():
             if definitions:
-                earliest_position = min(d.position for d in definitions)
-                all_vars.append((var_name, definitions, earliest_position))
+                earliest_position, resolved_var = self._resolve_single_variable(
+                    var_name, definitions, env_keys)
+                all_vars.append((var_name, definitions, earliest_position, resolved_var))
 
         # Sort by earliest position to maintain layer dependency order
-        all_vars.sort(key=lambda x: x[2])
+        all_vars.sort(key=operator.itemgetter(2))
 
-        for var_name, definitions, _ in all_vars:
-            resolved_var = self._resolve_single_variable(var_name, definitions)
+        for var_name, definitions, _, resolved_var in all_vars:
             if resolved_var:
                 resolved[var_name] = resolved_var
             elif var_name in os.environ:
@@ -648,35 +752,44 @@ class VariableResolver:
 
         return resolved
 
-    def _resolve_single_variable(self, var_name: str, definitions: List[EnvVariable]) -> Optional[EnvVariable]:
-        """Resolve a single variable using policy rules."""
-        import os
+    def _resolve_single_variable(self, var_name: str, definitions: List[EnvVariable],
+                                 env_keys: frozenset) -> Tuple[int, Optional[EnvVariable]]:
+        """Resolve a single variable using policy rules.
 
-        # Separate definitions by policy
-        force_defs = [d for d in definitions if d.set_policy == "force"]
-        immediate_defs = [d for d in definitions if d.set_policy == "immediate"]
-        lazy_defs = [d for d in definitions if d.set_policy == "lazy"]
+        Returns (earliest position across all definitions, resolved definition
+        or None). Tracks the last force, first immediate and last lazy
+        definitions in one pass instead of building per-policy lists.
+        """
+        earliest = definitions[0].position
+        last_force = first_immediate = last_lazy = None
+
+        for d in definitions:
+            pos = d.position
+            if pos < earliest:
+                earliest = pos
+            policy = d.set_policy
+            if policy == "force":
+                if last_force is None or pos > last_force.position:
+                    last_force = d
+            elif policy == "immediate":
+                if first_immediate is None or pos < first_immediate.position:
+                    first_immediate = d
+            elif policy == "lazy":
+                if last_lazy is None or pos > last_lazy.position:
+                    last_lazy = d
 
         # Rule a: If any variable is defined as force, use the last force definition
-        if force_defs:
-            return self._get_last_by_position(force_defs)
+        if last_force is not None:
+            return (earliest, last_force)
 
         # Rule b: Else if any immediate, use the first one provided the variable is not set in the env
-        elif immediate_defs and var_name not in os.environ:
-            return self._get_first_by_position(immediate_defs)
+        if first_immediate is not None and var_name not in env_keys:
+            return (earliest, first_immediate)
 
         # Rule c: If lazy, use the last one provided the variable is not set in the env
-        elif lazy_defs and var_name not in os.environ:
-            return self._get_last_by_position(lazy_defs)
+        if last_lazy is not None and var_name not in env_keys:
+            return (earliest, last_lazy)
 
         # Variable is set in environment or no applicable definitions
-        return None
-
-    def _get_first_by_position(self, definitions: List[EnvVariable]) -> EnvVariable:
-        """Get the definition with the earliest position (first in dependency order)."""
-        return min(definitions, key=lambda d: d.position)
-
-    def _get_last_by_position(self, definitions: List[EnvVariable]) -> EnvVariable:
-        """Get the definition with the latest position (last in dependency order)."""
-        return max(definitions, key=lambda d: d.position)
+        return (earliest, None)
 
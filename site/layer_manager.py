@@ -1,5 +1,8 @@
 import os
-import glob
+import fnmatch
+import functools
+import json
+import sys
 import shutil
 import argparse
 import shlex
@@ -10,6 +13,12 @@ from collections import OrderedDict
 from dataclasses import dataclass
 import yaml
 
+try:
+    # libyaml-backed loader - substantially faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 from metadata_parser import Metadata
 from metadata_parser import print_env_var_descriptions
@@ -24,9 +33,19 @@ class LayerSearchRoot:
     path: Path
 
 
+# Cache-miss sentinel (None is a valid cached value for unknown layers)
+_MISS = object()
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_path(identifier: str) -> Path:
+    """Resolve a path string once per distinct identifier (stat-heavy)."""
+    return Path(identifier).resolve()
+
+
 # Handles discovery, dependency resolution, and orchestration
 class LayerManager:
-    def __init__(self, search_paths: Optional[List[str]] = None, file_patterns: Optional[List[str]] = None, *, show_loaded: bool = False, doc_mode: bool = False):
+    def __init__(self, search_paths: Optional[List[str]] = None, file_patterns: Optional[List[str]] = None, *, show_loaded: bool = False, doc_mode: bool = False, manifest_path: Optional[str] = None):
         if search_paths is None:
             search_paths = ['./layer']
         if file_patterns is None:
@@ -42,9 +61,21 @@ class LayerManager:
         self.tag_to_path: Dict[str, Path] = {root.tag: root.path for root in self.search_roots}
         self.show_loaded = show_loaded
         self.doc_mode = doc_mode  # When True, load all layers regardless of environment variables
+        self.manifest_path = manifest_path  # Optional discovery cache across runs
+        # Layer info memo - Metadata.get_layer_info re-walks its container on
+        # every call and the graph queries hit it constantly. Layers are
+        # immutable after load, so results never need invalidating.
+        self._info_cache: Dict[str, Optional[dict]] = {}
         # provider index will be built after layers are loaded
         self.provider_index: Dict[str, str] = {}
         self.provider_conflicts: Dict[str, Set[str]] = {}
+        # reverse adjacency: dependency -> sorted list of dependent layers
+        self._rdeps: Dict[str, List[str]] = {}
+        # parsed YAML per layer file (mmdebstrap/env sections both read it)
+        self._yaml_cache: Dict[str, Optional[dict]] = {}
+        # layers proven to reach no dependency cycle (see
+        # _check_circular_dependencies); layers never mutate after load
+        self._cycle_free: Set[str] = set()
         self.generated_root: Optional[Path] = None
 
         # Tracks write-out order
@@ -59,6 +90,12 @@ class LayerManager:
         # now that self.layers is populated, build provider index
         self._build_provider_index()
 
+        # Reverse map for path-based layer lookups; resolving every loaded
+        # file once here replaces the per-query resolve-all-layers loop.
+        self._resolved_file_to_name: Dict[Path, str] = {
+            Path(path).resolve(): name for name, path in self.layer_files.items()
+        }
+
     def _build_search_roots(self, raw_paths: List[str]) -> List[LayerSearchRoot]:
         roots: List[LayerSearchRoot] = []
         seen_tags: Set[str] = set()
@@ -103,9 +140,9 @@ class LayerManager:
 
 
     def _build_provider_index(self):
-        """Index providers to unique layer names"""
-        for lname, layer in self.layers.items():
-            info = layer.get_layer_info()
+        """Index providers to unique layer names and reverse dependencies"""
+        for lname in self.layers:
+            info = self.get_layer_info(lname)
             if not info:
                 continue
             for prov in info.get('provides', []):
@@ -115,11 +152,22 @@ class LayerManager:
                     self.provider_conflicts.setdefault(prov, set()).update({existing, lname})
                 else:
                     self.provider_index[prov] = lname
+            for dep in info.get('depends', []):
+                self._rdeps.setdefault(dep, []).append(lname)
+
+        # Pre-sorted so reverse-dependency queries are a plain lookup
+        for deps in self._rdeps.values():
+            deps.sort()
 
     def load_layers(self):
         """Discover and load all layer files, creating Metadata objects for each"""
         loaded_layers = set()
 
+        # Discovery manifest: path -> [mtime, size, is_layer]. Unchanged files
+        # known not to be layers are skipped without re-parsing their YAML.
+        manifest = self._load_discovery_manifest()
+        new_manifest: Dict[str, list] = {}
+
         for root in self.search_roots:
             search_path = root.path
             if not search_path.exists():
@@ -129,13 +177,18 @@ class LayerManager:
                 # Reserved for generated output only
                 continue
 
-            # Find all matching files
-            all_files = []
-            for pattern in self.file_patterns:
-                files = glob.glob(str(search_path / "**" / pattern), recursive=True)
-                all_files.extend(files)
+            for metadata_file in self._iter_metadata_files(search_path):
+                try:
+                    st = os.stat(metadata_file)
+                except OSError:
+                    continue
+                cached = manifest.get(metadata_file)
+                if cached and cached[0] == st.st_mtime and cached[1] == st.st_size and not cached[2]:
+                    # Known non-layer file, unchanged since last run
+                    new_manifest[metadata_file] = cached
+                    continue
+                new_manifest[metadata_file] = [st.st_mtime, st.st_size, False]
 
-            for metadata_file in all_files:
                 try:
                     meta = Metadata(metadata_file, doc_mode=self.doc_mode)
                 except Exception:
@@ -195,6 +248,7 @@ class LayerManager:
                     except ValueError:
                         rel_path = abs_file
 
+                new_manifest[metadata_file][2] = True
                 self.layers[layer_name] = meta
                 self.layer_files[layer_name] = str(abs_file)
                 self.layer_tags[layer_name] = tag
@@ -205,6 +259,58 @@ class LayerManager:
                     relative_path = rel_path
                     metadata_type = 'x-env-layer' if meta.has_layer_info() else 'standard'
                     print(f"  Loaded layer: {layer_name} from {relative_path} ({metadata_type})")
+
+        self._save_discovery_manifest(new_manifest)
+
+    def _iter_metadata_files(self, search_path: Path):
+        """Walk a search root once with os.scandir, yielding matching files.
+
+        One traversal covers all file patterns, unlike a recursive glob per
+        pattern which re-walks the tree and fnmatches every entry. The common
+        '*.ext' patterns reduce to a single endswith against a suffix tuple."""
+        patterns = self.file_patterns
+        if all(p.startswith('*') and not any(c in p[1:] for c in '*?[') for p in patterns):
+            suffixes = tuple(p[1:] for p in patterns)
+            matches = lambda name: name.endswith(suffixes)
+        else:
+            matches = lambda name: any(fnmatch.fnmatch(name, p) for p in patterns)
+
+        stack = [str(search_path)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    if matches(entry.name):
+                        yield entry.path
+
+    def _load_discovery_manifest(self) -> Dict[str, list]:
+        if not self.manifest_path:
+            return {}
+        try:
+            with open(self.manifest_path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_discovery_manifest(self, manifest: Dict[str, list]):
+        if not self.manifest_path:
+            return
+        try:
+            with open(self.manifest_path, 'w') as f:
+                json.dump(manifest, f)
+        except OSError:
+            pass
+
     def _ensure_generated_root(self) -> Path:
         if self.generated_root is not None:
             return self.generated_root
@@ -230,9 +336,12 @@ class LayerManager:
             raise ValueError(f"Generator '{generator_cmd}' for layer '{layer_name}' failed with exit code {exc.returncode}") from exc
 
     def get_layer_info(self, layer_name: str) -> Optional[dict]:
-        if layer_name not in self.layers:
-            return None
-        return self.layers[layer_name].get_layer_info()
+        info = self._info_cache.get(layer_name, _MISS)
+        if info is _MISS:
+            meta = self.layers.get(layer_name)
+            info = meta.get_layer_info() if meta else None
+            self._info_cache[layer_name] = info
+        return info
 
     def get_layer_relative_spec(self, layer_name: str) -> Optional[str]:
         tag = self.layer_tags.get(layer_name)
@@ -250,22 +359,12 @@ class LayerManager:
 
     def get_reverse_dependencies(self, target_layer: str) -> List[str]:
         """Get hard reverse deps"""
-        reverse_deps = []
-
         # Resolve the target layer name first
         resolved_target = self.resolve_layer_name(target_layer)
         if not resolved_target:
             return []
 
-        # Search through all loaded layers
-        for layer_name, layer_obj in self.layers.items():
-            layer_info = layer_obj.get_layer_info()
-            if layer_info and layer_info.get('depends'):
-                # Check if target layer is in this layer's dependencies
-                if resolved_target in layer_info['depends']:
-                    reverse_deps.append(layer_name)
-
-        return sorted(reverse_deps)
+        return list(self._rdeps.get(resolved_target, []))
 
     def get_optional_dependencies(self, layer_name: str) -> List[str]:
         """Get optional deps"""
@@ -273,34 +372,42 @@ class LayerManager:
         return layer_info['optional_depends'] if layer_info else []
 
     def get_all_dependencies(self, layer_name: str, visited: Optional[Set[str]] = None, include_optional: bool = True) -> List[str]:
-        """Get all deps (including transitive) for a layer"""
+        """Get all deps (including transitive) for a layer.
+
+        Iterative depth-first expansion with one shared visited set. The old
+        recursive version copied the visited set per branch, which went
+        quadratic (and worse on diamond graphs) in both time and allocation;
+        a node's expansion is deterministic, so once it has been expanded on
+        one branch, revisiting it elsewhere can add nothing new."""
         if visited is None:
             visited = set()
 
         if layer_name in visited or layer_name not in self.layers:
             return []
 
-        visited.add(layer_name)
-        all_deps = []
+        def children(name: str) -> List[str]:
+            deps = self.get_dependencies(name)
+            if include_optional:
+                deps.extend(o for o in self.get_optional_dependencies(name)
+                            if o in self.layers)
+            return deps
 
-        # Add required dependencies
-        for dep in self.get_dependencies(layer_name):
-            if dep not in all_deps:
+        visited.add(layer_name)
+        all_deps: List[str] = []
+        seen: Set[str] = set()
+        stack = [iter(children(layer_name))]
+
+        while stack:
+            dep = next(stack[-1], None)
+            if dep is None:
+                stack.pop()
+                continue
+            if dep not in seen:
+                seen.add(dep)
                 all_deps.append(dep)
-            # Add transitive dependencies
-            for trans_dep in self.get_all_dependencies(dep, visited.copy(), include_optional):
-                if trans_dep not in all_deps:
-                    all_deps.append(trans_dep)
-
-        # Add optional dependencies if requested and they exist
-        if include_optional:
-            for opt_dep in self.get_optional_dependencies(layer_name):
-                if opt_dep in self.layers and opt_dep not in all_deps:
-                    all_deps.append(opt_dep)
-                    # Add transitive dependencies of optional dependencies
-                    for trans_dep in self.get_all_dependencies(opt_dep, visited.copy(), include_optional):
-                        if trans_dep not in all_deps:
-                            all_deps.append(trans_dep)
+            if dep not in visited and dep in self.layers:
+                visited.add(dep)
+                stack.append(iter(children(dep)))
 
         return all_deps
 
@@ -343,23 +450,39 @@ class LayerManager:
 
         return len(missing_deps) == 0, missing_deps + warnings
 
-    def _check_circular_dependencies(self, layer_name: str, path: Optional[List[str]] = None) -> List[str]:
-        """Check for circular dependencies"""
-        if path is None:
-            path = []
+    def _check_circular_dependencies(self, layer_name: str) -> List[str]:
+        """Check for circular dependencies reachable from a layer.
 
-        if layer_name in path:
-            return path + [layer_name]  # Found cycle
-
-        if layer_name not in self.layers:
+        Iterative colored depth-first search: the current path is the gray
+        set (a back-edge into it is a cycle) and nodes whose whole subtree
+        has been explored without finding one are remembered in
+        self._cycle_free, so repeated per-layer checks skip shared subgraphs
+        instead of re-walking them."""
+        if layer_name in self._cycle_free or layer_name not in self.layers:
             return []
 
-        path = path + [layer_name]
-
-        for dep in self.get_dependencies(layer_name):
-            cycle = self._check_circular_dependencies(dep, path)
-            if cycle:
-                return cycle
+        gray = {layer_name}
+        path = [layer_name]
+        stack = [iter(self.get_dependencies(layer_name))]
+
+        while stack:
+            dep = next(stack[-1], None)
+            if dep is None:
+                # Subtree fully explored without a back-edge: leave the gray
+                # path so sibling branches reaching this node don't see a
+                # false cycle, and remember it as clean.
+                stack.pop()
+                finished = path.pop()
+                gray.discard(finished)
+                self._cycle_free.add(finished)
+                continue
+            if dep in gray:
+                return path + [dep]  # Found cycle
+            if dep in self._cycle_free or dep not in self.layers:
+                continue
+            gray.add(dep)
+            path.append(dep)
+            stack.append(iter(self.get_dependencies(dep)))
 
         return []
 
@@ -449,11 +572,18 @@ class LayerManager:
                     scope_providers[provider] = layer_name
 
     def _load_layer_yaml(self, filepath: str) -> Optional[dict]:
+        # Parsed once per file; _get_mmdebstrap_config and _get_env_config
+        # both ask for the same document, per layer, per documentation pass.
+        if filepath in self._yaml_cache:
+            return self._yaml_cache[filepath]
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            # Bytes in one read - libyaml handles the decode itself
+            with open(filepath, 'rb') as f:
+                data = yaml.load(f.read(), Loader=_YamlLoader)
         except (FileNotFoundError, yaml.YAMLError, UnicodeDecodeError):
-            return None
+            data = None
+        self._yaml_cache[filepath] = data
+        return data
 
     def _get_mmdebstrap_config(self, layer_name: str) -> Optional[dict]:
         """Get mmdebstrap configuration if present """
@@ -515,53 +645,62 @@ class LayerManager:
         return variable_definitions
 
     def _apply_resolved_variables(self, resolved_variables: Dict[str, EnvVariable]):
-        """Apply resolved variables to environment and record for file writing."""
-        import os
+        """Apply resolved variables to environment and record for file writing.
 
-        # The resolver provides variables in the correct dependency order.
-        all_vars = list(resolved_variables.values())
+        Decisions are made against one snapshot of the environment, the new
+        values land in a single os.environ.update and the per-variable log
+        goes out in one stdout write instead of a print per variable."""
+        existing = frozenset(os.environ)
+        to_set: Dict[str, str] = {}
+        lines: List[str] = []
 
-        for env_var in all_vars:
+        # The resolver provides variables in the correct dependency order.
+        for env_var in resolved_variables.values():
             var_name = env_var.name
             value = env_var.value
             policy = env_var.set_policy
             layer_name = env_var.source_layer
 
             if policy == "force":
-                os.environ[var_name] = value
-                self._log_env_action("FORCE", var_name, value, layer_name)
+                to_set[var_name] = value
+                lines.append(self._log_env_action("FORCE", var_name, value, layer_name))
                 self.write_log[var_name] = value
 
             elif policy == "immediate":
-                if var_name not in os.environ:
-                    os.environ[var_name] = value
-                    self._log_env_action("SET", var_name, value, layer_name)
+                if var_name not in existing:
+                    to_set[var_name] = value
+                    lines.append(self._log_env_action("SET", var_name, value, layer_name))
                     self.write_log[var_name] = value
                 else:
-                    print(f"  [SKIP]  {var_name} (already set)")
+                    lines.append(f"  [SKIP]  {var_name} (already set)")
 
             elif policy == "lazy":
-                if var_name not in os.environ:
-                    os.environ[var_name] = value
-                    self._log_env_action("LAZY", var_name, value, layer_name)
+                if var_name not in existing:
+                    to_set[var_name] = value
+                    lines.append(self._log_env_action("LAZY", var_name, value, layer_name))
                     self.write_log[var_name] = value
                 else:
-                    print(f"  [SKIP]  {var_name} (already set)")
+                    lines.append(f"  [SKIP]  {var_name} (already set)")
 
             elif policy == "already_set":
                 # Variable was already in environment before we started
-                print(f"  [SKIP]  {var_name} (already set)")
+                lines.append(f"  [SKIP]  {var_name} (already set)")
 
             elif policy == "skip":
-                if var_name in os.environ:
-                    print(f"  [SKIP]  {var_name} (already set)")
+                if var_name in existing:
+                    lines.append(f"  [SKIP]  {var_name} (already set)")
                 else:
-                    print(f"  [SKIP]  {var_name} (Set: false/skip)")
+                    lines.append(f"  [SKIP]  {var_name} (Set: false/skip)")
+
+        if to_set:
+            os.environ.update(to_set)
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
 
 
-    def _log_env_action(self, tag: str, var: str, value: str, layer_name: str):
-        """Log environment variable action."""
-        print(f"  [{tag}]  {var}={value} (layer: {layer_name})")
+    def _log_env_action(self, tag: str, var: str, value: str, layer_name: str) -> str:
+        """Format an environment variable action log line."""
+        return f"  [{tag}]  {var}={value} (layer: {layer_name})"
 
 
 
@@ -667,10 +806,12 @@ class LayerManager:
         all_layer_names = [n for lst in categories.values() for n in lst]
         name_width = max(len(n) for n in all_layer_names) if all_layer_names else 0
 
-        print("Available layers:")
+        # Accumulate everything and emit with one write - per-line print
+        # flushes stdout each time when attached to a terminal.
+        buf = ["Available layers:"]
 
         for cat in sorted(categories.keys()):
-            print(f"{BOLD}Category: {cat}{RESET}")
+            buf.append(f"{BOLD}Category: {cat}{RESET}")
 
             for layer_name in sorted(categories[cat]):
                 layer_info = self.get_layer_info(layer_name)
@@ -684,17 +825,19 @@ class LayerManager:
                     desc = desc[: MAX_DESC - 3] + '...'
 
                 # Bold layer name column
-                print(f"  {BOLD}{layer_name:<{name_width}}{RESET}  {desc}")
+                buf.append(f"  {BOLD}{layer_name:<{name_width}}{RESET}  {desc}")
 
                 # Dependencies line
                 deps = ', '.join(layer_info['depends']) if layer_info['depends'] else 'none'
-                print(f"    deps: {deps}")
+                buf.append(f"    deps: {deps}")
 
                 # Capability info
                 provides = ', '.join(layer_info.get('provides', [])) or 'none'
                 reqprov = ', '.join(layer_info.get('provider_requires', [])) or 'none'
-                print(f"    provides: {provides}")
-                print(f"    requires-provider: {reqprov}")
+                buf.append(f"    provides: {provides}")
+                buf.append(f"    requires-provider: {reqprov}")
+
+        sys.stdout.write('\n'.join(buf) + '\n')
 
     def show_search_paths(self):
         print("Layer search paths:")
@@ -709,11 +852,10 @@ class LayerManager:
             return layer_identifier
 
         # File path lookup for already loaded layers
-        for layer_name, file_path in self.layer_files.items():
-            if Path(file_path).resolve() == Path(layer_identifier).resolve():
-                return layer_name
-
-        return None
+        try:
+            return self._resolved_file_to_name.get(_resolve_path(layer_identifier))
+        except OSError:
+            return None
 
     def process_layers(self, layer_ids: List[str], operation: str, **kwargs) -> bool:
         """Top level API for processing multiple layers with coordinated dependency resolution"""
@@ -876,6 +1018,18 @@ class LayerManager:
             'reverse_dependencies': reverse_dependencies
         }
 
+    def iter_documentation_data(self, layer_names: Optional[List[str]] = None):
+        """Yield (layer_name, doc_data) pairs in sorted layer name order.
+
+        Bulk path for documentation builds - reuses this manager's already
+        loaded metadata rather than having callers do per-layer lookups."""
+        if layer_names is None:
+            layer_names = sorted(self.layers.keys())
+        for layer_name in layer_names:
+            doc_data = self.get_layer_documentation_data(layer_name)
+            if doc_data:
+                yield layer_name, doc_data
+
     def _get_companion_doc(self, layer_name: str, format: str = 'markdown') -> str:
         if layer_name not in self.layer_files:
             return ""
@@ -158,8 +158,11 @@ class Metadata:
         self.filepath = filepath
         raw_metadata = self._load_metadata(filepath)
 
-        # Create the container (applies placeholder substitutions internally)
-        self._container = MetadataContainer.from_metadata_dict(raw_metadata, filepath, doc_mode)
+        # Create the container (applies placeholder substitutions internally).
+        # raw_metadata is freshly parsed and not reused, so the container can
+        # adopt it without a defensive copy.
+        self._container = MetadataContainer.from_metadata_dict(raw_metadata, filepath, doc_mode,
+                                                               take_ownership=True)
 
         # Create validation result builder
         self._result_builder = ValidationResultBuilder(filepath)
@@ -423,14 +426,18 @@ class Metadata:
         base_vars = set()
         attribute_vars = set()
 
+        # Prefix/suffix checks inlined - this loop runs for every metadata key
+        # and the XEnv wrappers would re-scan the name per predicate.
+        var_prefix = XEnv.VAR_PREFIX
+        prefix_len = len(var_prefix)
         for key in self._container.raw_metadata.keys():
-            if XEnv.is_var_field(key) and is_field_supported(key):
-                if XEnv.is_base_var_field(key):
+            if key.startswith(var_prefix) and is_field_supported(key):
+                var_part = key[prefix_len:]
+                if '-' not in var_part:
                     # Base variable definition
-                    base_vars.add(XEnv.extract_base_var_name(key).lower())
-                elif any(key.endswith(suffix) for suffix in ["-Desc", "-Valid", "-Required", "-Set"]):
+                    base_vars.add(var_part.lower())
+                else:
                     # Attribute field - extract variable name
-                    var_part = XEnv.extract_var_name(key)
                     for suffix in ["-Desc", "-Valid", "-Required", "-Set"]:
                         if var_part.endswith(suffix):
                             varname = var_part[:-len(suffix)].lower()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import re
 from abc import ABC, abstractmethod
 from typing import Optional, Union
@@ -314,8 +315,12 @@ def parse_validator(rule_str: str) -> BaseValidator:
             raise ValueError(f"Single value '{rule_str}' must use trailing comma ('{rule_str},') or keywords: prefix ('keywords:{rule_str}')")
 
 
+@functools.lru_cache(maxsize=1)
 def get_validator_documentation_data() -> dict:
-    """Extract structured validator data for documentation generation"""
+    """Extract structured validator data for documentation generation.
+
+    The class introspection walk only depends on module contents, so the
+    result is computed once and reused."""
     import inspect
 
     validator_classes = []